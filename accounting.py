@@ -0,0 +1,1717 @@
+"""
+Logika akuntansi tanpa Streamlit: uang dalam sen, ringkasan saldo bulanan,
+indeks saldo harian, edit jurnal, neraca saldo, buku besar, laporan
+keuangan, saldo akhir tahun, snapshot, dan cache laporan.
+
+numpy/pandas diimpor di dalam fungsi yang memakainya, supaya import modul
+ini (dan models/manage.py) tidak menanggung waktu load pandas.
+"""
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import BigInteger, and_, bindparam, case, cast, delete, event, extract, func, insert, or_, select, update
+from sqlalchemy.orm import Session, selectinload
+
+from db import singleton
+from models import (
+    Account,
+    AccountDailyBalance,
+    AccountMonthlyBalance,
+    AccountYearEndBalance,
+    ClosingStatus,
+    JournalEntry,
+    JournalLine,
+    ReportSnapshot,
+)
+
+
+# ============================================================
+# UANG DALAM SEN (INTEGER)
+# ============================================================
+# Semua nilai laporan disimpan sebagai int sen (Rp 1.234,56 -> 123456),
+# jadi penjumlahan dan cek balance eksak tanpa toleransi pembulatan.
+
+def to_cents(value) -> int:
+    """Rupiah (Decimal/float/int/str) -> int sen, dibulatkan half-up."""
+    if value is None:
+        return 0
+    if isinstance(value, int):
+        return value * 100
+    if not isinstance(value, Decimal):
+        # str(float) memberi digit yang tampil, bukan nilai biner float
+        value = Decimal(str(value))
+    return int((value * 100).to_integral_value(ROUND_HALF_UP))
+
+
+def cents_to_decimal(cents: int) -> Decimal:
+    """int sen -> Decimal rupiah dua desimal (untuk disimpan ke kolom Numeric)."""
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def sum_cents(values) -> int:
+    """Jumlah int sen sebagai array int64 (vektor), hasil int Python."""
+    import numpy as np
+
+    return int(np.fromiter(values, dtype=np.int64).sum())
+
+
+def sql_sum_cents(expr):
+    """SUM kolom Numeric rupiah sebagai BIGINT sen, dihitung database."""
+    return cast(func.round(func.sum(expr) * 100), BigInteger)
+
+
+# ============================================================
+# RINGKASAN SALDO BULANAN PER AKUN
+# ============================================================
+
+def post_balance_delta(session, entry_date: date, is_adjustment: bool, lines, sign: int = 1):
+    """
+    Terapkan baris jurnal ke tabel ringkasan saldo bulanan dan indeks saldo harian.
+    lines: iterable (account_id, is_debit, amount)
+    sign: 1 saat jurnal ditambahkan, -1 saat jurnal dihapus.
+    Dipanggil di dalam transaksi yang sama dengan penulisan jurnal (belum commit).
+    """
+    deltas = {}
+    for account_id, is_debit, amount in lines:
+        amount = Decimal(str(amount or 0)) * sign
+        debit, credit = deltas.get(account_id, (Decimal(0), Decimal(0)))
+        if is_debit:
+            debit += amount
+        else:
+            credit += amount
+        deltas[account_id] = (debit, credit)
+
+    # mutasi yang saling meniadakan (mis. baris edit yang tidak berubah) tidak ditulis
+    deltas = {account_id: delta for account_id, delta in deltas.items() if delta != (0, 0)}
+    if not deltas:
+        return
+
+    post_monthly_delta(session, entry_date, is_adjustment, deltas)
+    post_daily_deltas(
+        session, is_adjustment, {(account_id, entry_date): delta for account_id, delta in deltas.items()}
+    )
+
+
+def post_monthly_delta(session, entry_date: date, is_adjustment: bool, deltas: dict):
+    """
+    Tambahkan mutasi ke ringkasan saldo bulan entry_date.
+    deltas: {account_id: (debit, kredit)} dalam Decimal
+    """
+    # pastikan perubahan ringkasan sebelumnya di transaksi ini ikut terbaca
+    session.flush()
+
+    existing = {
+        row.account_id: row
+        for row in (
+            session.query(AccountMonthlyBalance)
+            .filter(
+                AccountMonthlyBalance.account_id.in_(list(deltas)),
+                AccountMonthlyBalance.year == entry_date.year,
+                AccountMonthlyBalance.month == entry_date.month,
+                AccountMonthlyBalance.is_adjustment == bool(is_adjustment),
+            )
+            .with_for_update()
+            .all()
+        )
+    }
+
+    for account_id, (debit, credit) in deltas.items():
+        row = existing.get(account_id)
+        if row is None:
+            row = AccountMonthlyBalance(
+                account_id=account_id,
+                year=entry_date.year,
+                month=entry_date.month,
+                is_adjustment=bool(is_adjustment),
+                debit=0,
+                credit=0,
+            )
+            session.add(row)
+
+        row.debit = Decimal(row.debit or 0) + debit
+        row.credit = Decimal(row.credit or 0) + credit
+
+        # baris kosong tidak perlu disimpan
+        if row.debit == 0 and row.credit == 0:
+            if row in session.new:
+                session.expunge(row)
+            else:
+                session.delete(row)
+
+
+def _raw_monthly_totals(session, year: int = None):
+    """Total debit/kredit per (akun, tahun, bulan, is_adjustment) langsung dari JournalLine."""
+    entry_year = extract("year", JournalEntry.date)
+    entry_month = extract("month", JournalEntry.date)
+    debit_sum = func.sum(case((JournalLine.is_debit == True, JournalLine.amount), else_=0))  # noqa: E712
+    credit_sum = func.sum(case((JournalLine.is_debit == False, JournalLine.amount), else_=0))  # noqa: E712
+
+    q = (
+        session.query(
+            JournalLine.account_id,
+            entry_year,
+            entry_month,
+            JournalEntry.is_adjustment,
+            debit_sum,
+            credit_sum,
+        )
+        .join(JournalEntry)
+        .group_by(JournalLine.account_id, entry_year, entry_month, JournalEntry.is_adjustment)
+    )
+    if year is not None:
+        q = q.filter(
+            JournalEntry.date >= date(year, 1, 1),
+            JournalEntry.date <= date(year, 12, 31),
+        )
+
+    return {
+        (account_id, int(y), int(m), bool(is_adj)): (Decimal(debit or 0), Decimal(credit or 0))
+        for account_id, y, m, is_adj, debit, credit in q.all()
+    }
+
+
+def rebuild_account_balances(session, year: int = None):
+    """
+    Hitung ulang tabel ringkasan saldo bulanan dari JournalLine
+    (satu tahun atau seluruhnya). Commit dilakukan oleh pemanggil.
+    """
+    q = session.query(AccountMonthlyBalance)
+    if year is not None:
+        q = q.filter(AccountMonthlyBalance.year == year)
+    q.delete(synchronize_session=False)
+
+    totals = _raw_monthly_totals(session, year)
+    for (account_id, y, m, is_adj), (debit, credit) in totals.items():
+        if debit == 0 and credit == 0:
+            continue
+        session.add(
+            AccountMonthlyBalance(
+                account_id=account_id,
+                year=y,
+                month=m,
+                is_adjustment=is_adj,
+                debit=debit,
+                credit=credit,
+            )
+        )
+    return len(totals)
+
+
+def verify_account_balances(session, year: int = None):
+    """
+    Bandingkan tabel ringkasan dengan JournalLine.
+    Hasil: daftar selisih (key, (debit, kredit) seharusnya, (debit, kredit) tersimpan).
+    """
+    expected = _raw_monthly_totals(session, year)
+
+    q = session.query(AccountMonthlyBalance)
+    if year is not None:
+        q = q.filter(AccountMonthlyBalance.year == year)
+    stored = {
+        (row.account_id, row.year, row.month, bool(row.is_adjustment)): (
+            Decimal(row.debit or 0),
+            Decimal(row.credit or 0),
+        )
+        for row in q.all()
+    }
+
+    zero = (Decimal(0), Decimal(0))
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        if expected.get(key, zero) != stored.get(key, zero):
+            mismatches.append((key, expected.get(key, zero), stored.get(key, zero)))
+    return mismatches
+
+
+# ============================================================
+# INDEKS SALDO HARIAN KUMULATIF PER AKUN
+# ============================================================
+
+def post_daily_deltas(session, is_adjustment: bool, deltas: dict):
+    """
+    Terapkan mutasi ke indeks saldo harian.
+    deltas: {(account_id, tanggal): (debit, kredit)} dalam Decimal
+    Baris akun yang tersentuh dibaca sekali per tahun; saldo kumulatif mulai
+    tanggal mutasi paling awal digeser, tanggal yang mutasinya menjadi nol
+    dihapus. Dipanggil di dalam transaksi penulisan jurnal (belum commit).
+    """
+    moves = {}
+    for (account_id, entry_date), (debit, credit) in deltas.items():
+        if debit or credit:
+            moves.setdefault((account_id, entry_date.year), {})[entry_date] = (Decimal(debit), Decimal(credit))
+    if not moves:
+        return
+
+    session.flush()
+    table = AccountDailyBalance.__table__
+    years = [year for _, year in moves]
+    stored = {}
+    for row_id, account_id, row_date, debit, credit in session.execute(
+        select(table.c.id, table.c.account_id, table.c.date, table.c.debit, table.c.credit)
+        .where(
+            table.c.account_id.in_(sorted({account_id for account_id, _ in moves})),
+            table.c.is_adjustment == bool(is_adjustment),
+            table.c.date >= date(min(years), 1, 1),
+            table.c.date <= date(max(years), 12, 31),
+        )
+        .with_for_update()
+    ):
+        stored.setdefault((account_id, row_date.year), {})[row_date] = (row_id, Decimal(debit), Decimal(credit))
+
+    inserts, updates, deletes = [], [], []
+    for (account_id, year), new_moves in moves.items():
+        rows = stored.get((account_id, year), {})
+
+        # mutasi harian = selisih kumulatif berurutan, lalu tambah mutasi baru
+        daily = {}
+        previous = (Decimal(0), Decimal(0))
+        for row_date in sorted(rows):
+            _, debit, credit = rows[row_date]
+            daily[row_date] = (debit - previous[0], credit - previous[1])
+            previous = (debit, credit)
+        for row_date, (debit, credit) in new_moves.items():
+            old_debit, old_credit = daily.get(row_date, (Decimal(0), Decimal(0)))
+            daily[row_date] = (old_debit + debit, old_credit + credit)
+
+        first = min(new_moves)
+        debit_total = credit_total = Decimal(0)
+        for row_date in sorted(daily):
+            debit, credit = daily[row_date]
+            debit_total += debit
+            credit_total += credit
+            if row_date < first:
+                continue
+            row = rows.get(row_date)
+            if debit == 0 and credit == 0:
+                if row is not None:
+                    deletes.append(row[0])
+            elif row is None:
+                inserts.append(
+                    {
+                        "account_id": account_id,
+                        "date": row_date,
+                        "is_adjustment": bool(is_adjustment),
+                        "debit": debit_total,
+                        "credit": credit_total,
+                    }
+                )
+            elif (row[1], row[2]) != (debit_total, credit_total):
+                updates.append({"row_id": row[0], "new_debit": debit_total, "new_credit": credit_total})
+
+    if deletes:
+        session.execute(delete(table).where(table.c.id.in_(deletes)))
+    if updates:
+        session.execute(
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values(debit=bindparam("new_debit"), credit=bindparam("new_credit")),
+            updates,
+        )
+    if inserts:
+        session.execute(insert(table), inserts)
+
+
+def _raw_daily_totals(session, year: int = None):
+    """Total debit/kredit per (akun, tanggal, is_adjustment) langsung dari JournalLine, urut tanggal."""
+    debit_sum = func.sum(case((JournalLine.is_debit == True, JournalLine.amount), else_=0))  # noqa: E712
+    credit_sum = func.sum(case((JournalLine.is_debit == False, JournalLine.amount), else_=0))  # noqa: E712
+
+    q = (
+        session.query(JournalLine.account_id, JournalEntry.date, JournalEntry.is_adjustment, debit_sum, credit_sum)
+        .join(JournalEntry)
+        .group_by(JournalLine.account_id, JournalEntry.date, JournalEntry.is_adjustment)
+        .order_by(JournalEntry.date)
+    )
+    if year is not None:
+        q = q.filter(
+            JournalEntry.date >= date(year, 1, 1),
+            JournalEntry.date <= date(year, 12, 31),
+        )
+    return q.all()
+
+
+def _expected_daily_balances(session, year: int = None):
+    """Isi indeks saldo harian yang seharusnya: {(akun, tanggal, is_adjustment): (debit, kredit) kumulatif}."""
+    expected = {}
+    running = {}
+    for account_id, entry_date, is_adj, debit, credit in _raw_daily_totals(session, year):
+        debit, credit = Decimal(debit or 0), Decimal(credit or 0)
+        if debit == 0 and credit == 0:
+            continue
+        key = (account_id, entry_date.year, bool(is_adj))
+        debit_total, credit_total = running.get(key, (Decimal(0), Decimal(0)))
+        running[key] = (debit_total + debit, credit_total + credit)
+        expected[(account_id, entry_date, bool(is_adj))] = running[key]
+    return expected
+
+
+def _daily_rows(session, year: int = None):
+    q = session.query(AccountDailyBalance)
+    if year is not None:
+        q = q.filter(
+            AccountDailyBalance.date >= date(year, 1, 1),
+            AccountDailyBalance.date <= date(year, 12, 31),
+        )
+    return q
+
+
+def rebuild_daily_balances(session, year: int = None):
+    """
+    Hitung ulang indeks saldo harian dari JournalLine (satu tahun atau
+    seluruhnya). Commit dilakukan oleh pemanggil.
+    """
+    _daily_rows(session, year).delete(synchronize_session=False)
+
+    rows = [
+        {"account_id": account_id, "date": entry_date, "is_adjustment": is_adj, "debit": debit, "credit": credit}
+        for (account_id, entry_date, is_adj), (debit, credit) in _expected_daily_balances(session, year).items()
+    ]
+    if rows:
+        session.execute(insert(AccountDailyBalance.__table__), rows)
+    return len(rows)
+
+
+def verify_daily_balances(session, year: int = None):
+    """
+    Bandingkan indeks saldo harian dengan JournalLine.
+    Hasil: daftar selisih ((akun, tanggal, is_adjustment), seharusnya, tersimpan).
+    """
+    expected = _expected_daily_balances(session, year)
+    stored = {
+        (row.account_id, row.date, bool(row.is_adjustment)): (Decimal(row.debit), Decimal(row.credit))
+        for row in _daily_rows(session, year)
+    }
+
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        if expected.get(key) != stored.get(key):
+            mismatches.append((key, expected.get(key), stored.get(key)))
+    return mismatches
+
+
+def get_daily_cumulative(session, as_of: date) -> dict:
+    """
+    Total debit/kredit sejak 1 Januari tahun as_of sampai dengan as_of,
+    dari baris indeks terakhir per akun (satu lookup, tanpa membaca jurnal).
+    Hasil: {(account_id, is_adjustment): (debit, kredit)} dalam int sen
+    """
+    # MAX(date) per (akun, is_adjustment) dilayani unique index
+    # (account_id, is_adjustment, date): MySQL memakai loose index scan
+    last = (
+        session.query(
+            AccountDailyBalance.account_id,
+            AccountDailyBalance.is_adjustment,
+            func.max(AccountDailyBalance.date).label("date"),
+        )
+        .filter(AccountDailyBalance.date >= date(as_of.year, 1, 1), AccountDailyBalance.date <= as_of)
+        .group_by(AccountDailyBalance.account_id, AccountDailyBalance.is_adjustment)
+        .subquery()
+    )
+    result = session.query(
+        AccountDailyBalance.account_id,
+        AccountDailyBalance.is_adjustment,
+        AccountDailyBalance.debit,
+        AccountDailyBalance.credit,
+    ).join(
+        last,
+        and_(
+            AccountDailyBalance.account_id == last.c.account_id,
+            AccountDailyBalance.is_adjustment == last.c.is_adjustment,
+            AccountDailyBalance.date == last.c.date,
+        ),
+    )
+    return {
+        (account_id, bool(is_adj)): (to_cents(debit), to_cents(credit))
+        for account_id, is_adj, debit, credit in result
+    }
+
+
+# ============================================================
+# PERIODE LAPORAN (TAHUN, RENTANG TANGGAL, PER TANGGAL)
+# ============================================================
+
+def report_period(year: int = None, start: date = None, end: date = None, as_of: date = None):
+    """
+    Rentang laporan (awal, akhir) dari salah satu: as_of (1 Januari tahun
+    itu s.d. as_of), start/end (yang kosong diisi awal/akhir tahunnya),
+    atau year (1 Januari - 31 Desember).
+    """
+    if as_of is not None:
+        start, end = date(as_of.year, 1, 1), as_of
+    elif start is not None or end is not None:
+        start = start or date(end.year, 1, 1)
+        end = end or date(start.year, 12, 31)
+    elif year is not None:
+        return date(year, 1, 1), date(year, 12, 31)
+    else:
+        raise ValueError("Tahun atau tanggal laporan belum diisi.")
+
+    if start > end:
+        raise ValueError("Tanggal awal harus sebelum tanggal akhir.")
+    return start, end
+
+
+def full_year(start: date, end: date):
+    """Tahun jika rentang tepat 1 Januari - 31 Desember satu tahun, selain itu None."""
+    if start == date(start.year, 1, 1) and end == date(start.year, 12, 31):
+        return start.year
+    return None
+
+
+def _monthly_totals(session, years):
+    result = (
+        session.query(
+            AccountMonthlyBalance.account_id,
+            AccountMonthlyBalance.is_adjustment,
+            sql_sum_cents(AccountMonthlyBalance.debit),
+            sql_sum_cents(AccountMonthlyBalance.credit),
+        )
+        .filter(AccountMonthlyBalance.year.in_(years))
+        .group_by(AccountMonthlyBalance.account_id, AccountMonthlyBalance.is_adjustment)
+    )
+    return {
+        (account_id, bool(is_adj)): (int(debit or 0), int(credit or 0))
+        for account_id, is_adj, debit, credit in result
+    }
+
+
+def get_period_totals(session, start: date, end: date) -> dict:
+    """
+    Total debit/kredit per (akun, is_adjustment) dalam rentang tanggal.
+    Tahun yang tercakup penuh dibaca dari ringkasan saldo bulanan; potongan
+    tahun = selisih dua lookup indeks saldo harian (akhir potongan dikurangi
+    hari sebelum awal potongan).
+    Hasil: {(account_id, is_adjustment): (debit, kredit)} dalam int sen
+    """
+    totals = {}
+
+    def add(values, sign=1):
+        for key, (debit, credit) in values.items():
+            old_debit, old_credit = totals.get(key, (0, 0))
+            totals[key] = (old_debit + sign * debit, old_credit + sign * credit)
+
+    full_years = []
+    for year in range(start.year, end.year + 1):
+        first, last = max(start, date(year, 1, 1)), min(end, date(year, 12, 31))
+        if full_year(first, last):
+            full_years.append(year)
+            continue
+        add(get_daily_cumulative(session, last))
+        if first > date(year, 1, 1):
+            add(get_daily_cumulative(session, first - timedelta(days=1)), -1)
+    if full_years:
+        add(_monthly_totals(session, full_years))
+
+    return {key: value for key, value in totals.items() if value != (0, 0)}
+
+
+# ============================================================
+# LOGIKA AKUNTANSI (TRIAL BALANCE, ADJUSTED TB, LAPORAN)
+# ============================================================
+
+def is_year_closed(session, year: int) -> bool:
+    status = (
+        session.query(ClosingStatus)
+        .filter(ClosingStatus.year == year, ClosingStatus.is_closed == True)  # noqa: E712
+        .first()
+    )
+    return status is not None
+
+def format_cents(cents: int):
+    """Format int sen menjadi format Rupiah"""
+    if cents == 0:
+        return "Rp 0"
+    return f"Rp {cents_to_decimal(cents):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def format_rupiah(value):
+    """Format angka (rupiah) menjadi format Rupiah"""
+    return format_cents(to_cents(value))
+
+
+@singleton
+def _format_tables():
+    """Potongan string untuk format_cents_array: grup ribuan 0..999 dan sen 00..99."""
+    import numpy as np
+
+    head = np.array([str(i) for i in range(1000)])
+    tail = np.array([f".{i:03d}" for i in range(1000)] + [""])
+    cents = np.array([f",{i:02d}" for i in range(100)])
+    return head, tail, cents
+
+
+def format_cents_array(values):
+    """
+    format_cents untuk satu kolom sekaligus (vektor numpy, tanpa loop per sel):
+    tiap grup ribuan diambil dari tabel string lalu digabung per posisi grup.
+    Nilai kosong (<NA>/None) menjadi string kosong.
+    """
+    import numpy as np
+    import pandas as pd
+
+    values = pd.array(values, dtype="Int64")
+    if len(values) == 0:
+        return np.array([], dtype=str)
+
+    cents = values.to_numpy(dtype=np.int64, na_value=0)
+    thousands_head, thousands_tail, cents_tail = _format_tables()
+    amount = np.abs(cents)
+    whole = amount // 100
+
+    # jumlah grup ribuan per nilai
+    groups = np.ones(len(whole), dtype=np.int64)
+    bound = 1000
+    while (whole >= bound).any():
+        groups += whole >= bound
+        bound *= 1000
+
+    text = np.char.add(np.where(cents < 0, "Rp -", "Rp "), thousands_head[whole // 1000 ** (groups - 1)])
+    for pos in range(int(groups.max()) - 2, -1, -1):
+        index = np.where(groups - 1 > pos, whole // 1000 ** pos % 1000, 1000)
+        text = np.char.add(text, thousands_tail[index])
+    text = np.char.add(text, cents_tail[amount % 100])
+
+    text[cents == 0] = "Rp 0"
+    text[np.asarray(values.isna())] = ""
+    return text
+
+
+def format_money_columns(df, *columns):
+    """Salinan DataFrame untuk ditampilkan: kolom uang (int sen) diformat Rupiah."""
+    df = df.copy()
+    for column in columns:
+        df[column] = format_cents_array(df[column])
+    return df
+
+def get_account_totals(
+    session, year: int = None, is_adjustment: bool = False, start: date = None, end: date = None, as_of: date = None
+):
+    """
+    Total debit dan kredit per akun untuk satu tahun atau rentang tanggal
+    (start/end atau as_of, lihat report_period), lewat get_period_totals().
+    is_adjustment=None berarti jurnal umum dan penyesuaian sekaligus.
+    Hasil: {account_id: (total_debit, total_kredit)} dalam int sen
+    """
+    start, end = report_period(year, start, end, as_of)
+    totals = {}
+    for (account_id, is_adj), (debit, credit) in get_period_totals(session, start, end).items():
+        if is_adjustment is None or is_adj == bool(is_adjustment):
+            old_debit, old_credit = totals.get(account_id, (0, 0))
+            totals[account_id] = (old_debit + debit, old_credit + credit)
+    return totals
+
+
+def compute_trial_balance(session, year: int = None, start: date = None, end: date = None, as_of: date = None):
+    """
+    Neraca saldo sebelum penyesuaian, hanya jurnal umum (is_adjustment=False).
+    Hanya tampilkan akun yang memiliki nominal. Debit/Kredit dalam int sen.
+    Periode: satu tahun, atau start/end / as_of (lihat report_period).
+    """
+    accounts = (
+        session.query(Account)
+        .filter(Account.is_active == True)  # noqa: E712
+        .order_by(Account.code)
+        .all()
+    )
+    totals = get_account_totals(session, year, is_adjustment=False, start=start, end=end, as_of=as_of)
+
+    rows = []
+    debits = []
+    credits = []
+
+    for acc in accounts:
+        debit_sum, credit_sum = totals.get(acc.id, (0, 0))
+
+        # Hanya tambahkan akun jika ada transaksi (debit_sum > 0 atau credit_sum > 0)
+        if debit_sum > 0 or credit_sum > 0:
+            if debit_sum >= credit_sum:
+                debit = debit_sum - credit_sum
+                credit = 0
+            else:
+                debit = 0
+                credit = credit_sum - debit_sum
+
+            debits.append(debit)
+            credits.append(credit)
+
+            rows.append(
+                {
+                    "Kode Akun": acc.code,
+                    "Nama Akun": acc.name,
+                    "Debit": debit,
+                    "Kredit": credit,
+                }
+            )
+
+    return rows, sum_cents(debits), sum_cents(credits)
+
+
+def get_account_totals_by_journal(session, year: int = None, start: date = None, end: date = None, as_of: date = None):
+    """
+    Total debit dan kredit per akun, dipisah jurnal umum dan jurnal
+    penyesuaian. Untuk satu tahun penuh cukup satu query agregat (GROUP BY
+    account_id, is_adjustment) atas tabel ringkasan saldo bulanan.
+    Hasil: {account_id: {False: (debit, kredit), True: (debit, kredit)}} dalam int sen
+    """
+    start, end = report_period(year, start, end, as_of)
+    totals = {}
+    for (account_id, is_adjustment), cents in get_period_totals(session, start, end).items():
+        totals.setdefault(account_id, {})[is_adjustment] = cents
+    return totals
+
+
+def build_adjusted_worksheet(session, year: int = None, start: date = None, end: date = None, as_of: date = None):
+    """
+    Kertas kerja neraca saldo penyesuaian per akun aktif:
+    - saldo sebelum penyesuaian (jurnal umum)
+    - penyesuaian (jurnal penyesuaian)
+    - saldo setelah penyesuaian
+    Semua saldo dalam bentuk debit - kredit (int sen). Hanya akun yang memiliki nominal.
+    """
+    accounts = (
+        session.query(Account)
+        .filter(Account.is_active == True)  # noqa: E712
+        .order_by(Account.code)
+        .all()
+    )
+    totals = get_account_totals_by_journal(session, year, start=start, end=end, as_of=as_of)
+
+    worksheet = []
+    for acc in accounts:
+        acc_totals = totals.get(acc.id)
+        if not acc_totals:
+            continue
+
+        debit_gen, credit_gen = acc_totals.get(False, (0, 0))
+        debit_adj, credit_adj = acc_totals.get(True, (0, 0))
+
+        saldo_awal = debit_gen - credit_gen
+        penyesuaian = debit_adj - credit_adj
+
+        worksheet.append(
+            {
+                "code": acc.code,
+                "name": acc.name,
+                "unadjusted": saldo_awal,
+                "adjustment": penyesuaian,
+                "adjusted": saldo_awal + penyesuaian,
+            }
+        )
+
+    return worksheet
+
+
+def adjusted_trial_balance_from_worksheet(worksheet):
+    """
+    Neraca saldo setelah penyesuaian dari kertas kerja:
+    - Hanya tampilkan akun yang memiliki saldo
+    - Debit/Kredit dalam int sen
+    """
+    rows = []
+    debits = []
+    credits = []
+
+    for item in worksheet:
+        saldo_akhir = item["adjusted"]
+
+        # Hanya tampilkan akun yang memiliki saldo (tidak nol)
+        if saldo_akhir != 0:
+            if saldo_akhir > 0:
+                debit = saldo_akhir
+                credit = 0
+            else:
+                debit = 0
+                credit = -saldo_akhir
+
+            debits.append(debit)
+            credits.append(credit)
+
+            rows.append(
+                {
+                    "Kode Akun": item["code"],
+                    "Nama Akun": item["name"],
+                    "Debit": debit,
+                    "Kredit": credit,
+                }
+            )
+
+    return rows, sum_cents(debits), sum_cents(credits)
+
+
+def build_adjusted_trial_balance(session, year: int = None, start: date = None, end: date = None, as_of: date = None):
+    """
+    Neraca saldo setelah penyesuaian:
+    - Hanya tampilkan akun yang memiliki nominal
+    """
+    return adjusted_trial_balance_from_worksheet(build_adjusted_worksheet(session, year, start=start, end=end, as_of=as_of))
+
+
+# normal balance di debit; tipe lain (liability, equity, revenue) di kredit
+DEBIT_NORMAL_TYPES = ("asset", "expense", "prive")
+
+
+def get_account_balances(session, year: int = None, start: date = None, end: date = None, as_of: date = None):
+    """
+    Vektor saldo satu tahun (jurnal umum + penyesuaian) untuk semua akun,
+    dalam satu query: akun LEFT JOIN total ringkasan saldo per akun. Rentang
+    tanggal lain: daftar akun + get_period_totals().
+    Hasil: DataFrame urut kode akun dengan kolom id, code, name,
+    account_type, balance (int sen, sesuai normal balance akun).
+    """
+    import numpy as np
+    import pandas as pd
+
+    start, end = report_period(year, start, end, as_of)
+    year = full_year(start, end)
+    if year is None:
+        accounts = session.query(Account.id, Account.code, Account.name, Account.account_type).order_by(Account.code)
+        totals = {}
+        for (account_id, _), (debit, credit) in get_period_totals(session, start, end).items():
+            totals[account_id] = totals.get(account_id, 0) + debit - credit
+        df = pd.DataFrame(accounts.all(), columns=["id", "code", "name", "account_type"])
+        debit_minus_credit = df["id"].map(totals).fillna(0).astype(np.int64)
+        df["balance"] = debit_minus_credit * np.where(df["account_type"].isin(DEBIT_NORMAL_TYPES), 1, -1)
+        return df
+
+    totals = (
+        session.query(
+            AccountMonthlyBalance.account_id.label("account_id"),
+            sql_sum_cents(AccountMonthlyBalance.debit).label("debit"),
+            sql_sum_cents(AccountMonthlyBalance.credit).label("credit"),
+        )
+        .filter(AccountMonthlyBalance.year == year)
+        .group_by(AccountMonthlyBalance.account_id)
+        .subquery()
+    )
+    result = (
+        session.query(
+            Account.id,
+            Account.code,
+            Account.name,
+            Account.account_type,
+            func.coalesce(totals.c.debit, 0),
+            func.coalesce(totals.c.credit, 0),
+        )
+        .outerjoin(totals, totals.c.account_id == Account.id)
+        .order_by(Account.code)
+        .all()
+    )
+
+    df = pd.DataFrame(result, columns=["id", "code", "name", "account_type", "debit", "credit"])
+    debit_minus_credit = df["debit"].astype(np.int64) - df["credit"].astype(np.int64)
+    sign = np.where(df["account_type"].isin(DEBIT_NORMAL_TYPES), 1, -1)
+    df["balance"] = debit_minus_credit * sign
+    return df.drop(columns=["debit", "credit"])
+
+
+def get_income_statement_data(session, year: int = None, start: date = None, end: date = None, as_of: date = None):
+    """
+    Laporan laba rugi:
+    - total pendapatan (positif)
+    - total beban (positif)
+    - laba bersih = pendapatan - beban
+    Semua nilai dalam int sen.
+    """
+    balances = get_account_balances(session, year, start=start, end=end, as_of=as_of)
+    by_type = balances.groupby("account_type")["balance"].sum()
+
+    total_revenue = int(by_type.get("revenue", 0))
+    total_expense = int(by_type.get("expense", 0))
+    net_income = total_revenue - total_expense
+    return total_revenue, total_expense, net_income
+
+
+def get_balance_sheet_data(session, year: int = None, start: date = None, end: date = None, as_of: date = None):
+    """
+    Ringkasan neraca akhir periode (saldo dibawa dari periode sebelumnya):
+    total aset, liabilitas, dan ekuitas termasuk laba ditahan (int sen).
+    """
+    balances, retained_earnings = get_cumulative_balances(session, year, start=start, end=end, as_of=as_of)
+    by_type = balances.groupby("account_type")["balance"].sum()
+
+    total_asset = int(by_type.get("asset", 0))
+    total_liability = int(by_type.get("liability", 0))
+    total_equity = int(by_type.get("equity", 0)) + retained_earnings
+    return total_asset, total_liability, total_equity
+
+
+# kolom tren: nilai uang (int sen) lalu rasio (persen)
+TREND_MONEY_COLUMNS = ("revenue", "expense", "net_income", "asset", "liability", "equity")
+TREND_RATIO_COLUMNS = ("profit_margin", "debt_ratio")
+
+
+def get_trend_data(session, start_year: int, end_year: int, monthly: bool = False):
+    """
+    Pendapatan, beban, laba bersih, aset, liabilitas, ekuitas untuk rentang
+    tahun dalam satu query GROUP BY tahun[, bulan], tipe akun pada tabel
+    ringkasan saldo bulanan (jurnal umum + penyesuaian), jadi biaya hampir
+    sama untuk satu atau sepuluh tahun.
+
+    Hasil: DataFrame index year (atau year, month) dengan TREND_MONEY_COLUMNS
+    dalam int sen dan TREND_RATIO_COLUMNS dalam persen (NaN jika pembagi 0).
+    Pendapatan/beban/laba adalah mutasi periode itu; aset/liabilitas/ekuitas
+    saldo akhir periode, mulai dari saldo awal tahun pertama (lihat
+    get_opening_balances). Ekuitas = modal akhir (ekuitas + laba ditahan +
+    laba berjalan - prive), jadi aset = liabilitas + ekuitas.
+    """
+    import numpy as np
+    import pandas as pd
+
+    group = [AccountMonthlyBalance.year]
+    if monthly:
+        group.append(AccountMonthlyBalance.month)
+
+    result = (
+        session.query(
+            *group,
+            Account.account_type,
+            sql_sum_cents(AccountMonthlyBalance.debit),
+            sql_sum_cents(AccountMonthlyBalance.credit),
+        )
+        .join(Account, Account.id == AccountMonthlyBalance.account_id)
+        .filter(AccountMonthlyBalance.year >= start_year, AccountMonthlyBalance.year <= end_year)
+        .group_by(*group, Account.account_type)
+        .all()
+    )
+
+    index_names = ["year", "month"] if monthly else ["year"]
+    df = pd.DataFrame(result, columns=index_names + ["account_type", "debit", "credit"])
+    debit_minus_credit = df["debit"].astype(np.int64) - df["credit"].astype(np.int64)
+    df["balance"] = debit_minus_credit * np.where(df["account_type"].isin(DEBIT_NORMAL_TYPES), 1, -1)
+
+    # tahun/bulan tanpa transaksi tetap tampil sebagai 0
+    years = range(start_year, end_year + 1)
+    if monthly:
+        index = pd.MultiIndex.from_product([years, range(1, 13)], names=index_names)
+    else:
+        index = pd.Index(years, name="year")
+
+    trends = (
+        df.pivot_table(index=index_names, columns="account_type", values="balance", aggfunc="sum")
+        .reindex(index=index, columns=["revenue", "expense", "prive", "asset", "liability", "equity"])
+        .fillna(0)
+        .astype(np.int64)
+        .rename_axis(columns=None)
+    )
+    trends["net_income"] = trends["revenue"] - trends["expense"]
+
+    # neraca: saldo awal + mutasi kumulatif sampai akhir periode
+    opening = _opening_totals_by_type(session, start_year)
+    trends["equity"] += trends["net_income"] - trends["prive"]
+    for column, opening_total in opening.items():
+        trends[column] = opening_total + trends[column].cumsum()
+
+    trends = trends[list(TREND_MONEY_COLUMNS)]
+    trends["profit_margin"] = trends["net_income"] / trends["revenue"].where(trends["revenue"] != 0) * 100
+    trends["debt_ratio"] = trends["liability"] / trends["asset"].where(trends["asset"] != 0) * 100
+    return trends
+
+
+def _opening_totals_by_type(session, year: int) -> dict:
+    """Saldo awal aset, liabilitas, dan modal (ekuitas + laba ditahan - prive) dalam int sen."""
+    opening = get_opening_balances(session, year)
+    totals = {"asset": 0, "liability": 0, "equity": 0}
+    if not opening:
+        return totals
+    for account_id, account_type in session.query(Account.id, Account.account_type).filter(
+        Account.id.in_(list(opening))
+    ):
+        if account_type == "asset":
+            totals["asset"] += opening[account_id]
+        elif account_type == "liability":
+            totals["liability"] -= opening[account_id]
+        else:
+            # ekuitas dan akun nominal tahun-tahun sebelumnya (laba ditahan)
+            totals["equity"] -= opening[account_id]
+    return totals
+
+
+LEDGER_OPENING_LABEL = "Saldo awal"
+
+
+def get_ledger_data(session, year: int = None, start: date = None, end: date = None, as_of: date = None):
+    """
+    Buku besar satu tahun atau rentang tanggal dalam satu query: semua baris
+    jurnal diurutkan per akun (tanggal, nomor, id) dengan saldo berjalan
+    (debit - kredit) dihitung database lewat SUM() OVER (PARTITION BY
+    account_id ...). Rentang yang dimulai setelah 1 Januari diawali baris
+    "Saldo awal" (jumlah 0) dari indeks saldo harian, saldo berjalan
+    dilanjutkan dari situ.
+    Hasil: {account_id: [baris, ...]}, jumlah dan saldo dalam int sen
+    """
+    start, end = report_period(year, start, end, as_of)
+
+    ledger = {}
+    opening = {}
+    if start > date(start.year, 1, 1):
+        for (account_id, _), (debit, credit) in get_daily_cumulative(session, start - timedelta(days=1)).items():
+            opening[account_id] = opening.get(account_id, 0) + debit - credit
+        for account_id, saldo in opening.items():
+            if saldo:
+                ledger[account_id] = [
+                    {
+                        "date": start,
+                        "description": LEDGER_OPENING_LABEL,
+                        "number": "",
+                        "is_debit": saldo > 0,
+                        "amount": 0,
+                        "saldo": saldo,
+                    }
+                ]
+
+    signed_amount = case(
+        (JournalLine.is_debit == True, JournalLine.amount),  # noqa: E712
+        else_=-JournalLine.amount,
+    )
+    saldo = func.sum(signed_amount).over(
+        partition_by=JournalLine.account_id,
+        order_by=(JournalEntry.date, JournalEntry.number, JournalLine.id),
+        rows=(None, 0),
+    )
+
+    result = (
+        session.query(
+            JournalLine.account_id,
+            JournalEntry.date,
+            JournalEntry.description,
+            JournalEntry.number,
+            JournalLine.is_debit,
+            JournalLine.amount,
+            saldo,
+        )
+        .join(JournalEntry)
+        .filter(
+            JournalEntry.date >= start,
+            JournalEntry.date <= end,
+        )
+        .order_by(JournalLine.account_id, JournalEntry.date, JournalEntry.number, JournalLine.id)
+    )
+
+    for account_id, entry_date, description, number, is_debit, amount, running in result:
+        ledger.setdefault(account_id, []).append(
+            {
+                "date": entry_date,
+                "description": description,
+                "number": number,
+                "is_debit": bool(is_debit),
+                "amount": to_cents(amount),
+                "saldo": opening.get(account_id, 0) + to_cents(running),
+            }
+        )
+    return ledger
+
+
+def build_ledger_frame(lines):
+    """
+    DataFrame buku besar satu akun dari baris get_ledger_data(). Kolom uang
+    tetap int sen (kosong = <NA>), format Rupiah dilakukan saat ditampilkan.
+    """
+    import numpy as np
+    import pandas as pd
+
+    df = pd.DataFrame(lines, columns=["date", "description", "number", "is_debit", "amount", "saldo"])
+    amount = df["amount"].astype("Int64")
+    saldo = df["saldo"].astype("Int64")
+    is_debit = df["is_debit"].astype(bool)
+
+    # paling banyak 366 tanggal berbeda per tahun: format sekali per tanggal
+    codes, dates = pd.factorize(df["date"])
+    tanggal = np.array([d.strftime("%d-%m-%Y") for d in dates], dtype=object)[codes]
+
+    return pd.DataFrame(
+        {
+            "No": np.arange(1, len(df) + 1),
+            "Tanggal": tanggal,
+            "Keterangan": df["description"],
+            "No Trans": df["number"],
+            "Debit": amount.where(is_debit & (amount > 0)),
+            "Kredit": amount.where(~is_debit & (amount > 0)),
+            "Saldo Debit": saldo.where(saldo > 0),
+            "Saldo Kredit": (-saldo).where(saldo < 0),
+        }
+    )
+
+
+LEDGER_MONEY_COLUMNS = ("Debit", "Kredit", "Saldo Debit", "Saldo Kredit")
+
+
+JOURNAL_PAGE_SIZES = [25, 50, 100, 200]
+
+
+def journal_filter_conditions(
+    is_adjustment: bool,
+    date_from: date,
+    date_to: date,
+    number_prefix: str = "",
+    account_id: int = None,
+    amount_min: float = None,
+    amount_max: float = None,
+):
+    """
+    Kondisi SQL untuk daftar jurnal. Filter akun dan jumlah berlaku jika
+    salah satu baris jurnal cocok (EXISTS pada JournalLine).
+    """
+    conditions = [
+        JournalEntry.date >= date_from,
+        JournalEntry.date <= date_to,
+        JournalEntry.is_adjustment == is_adjustment,
+    ]
+    if number_prefix:
+        conditions.append(JournalEntry.number.startswith(number_prefix, autoescape=True))
+
+    line_conditions = []
+    if account_id:
+        line_conditions.append(JournalLine.account_id == account_id)
+    if amount_min is not None:
+        line_conditions.append(JournalLine.amount >= amount_min)
+    if amount_max is not None:
+        line_conditions.append(JournalLine.amount <= amount_max)
+    if line_conditions:
+        conditions.append(JournalEntry.lines.any(and_(*line_conditions)))
+
+    return conditions
+
+
+def fetch_journal_page(session, conditions, after=None, page_size: int = 50):
+    """
+    Satu halaman jurnal dengan keyset pagination pada (tanggal, nomor, id).
+    after: (tanggal, nomor, id) jurnal terakhir halaman sebelumnya.
+    Hasil: (daftar JournalEntry beserta baris dan akunnya, ada halaman berikutnya)
+    """
+    q = (
+        session.query(JournalEntry)
+        .options(selectinload(JournalEntry.lines).joinedload(JournalLine.account))
+        .filter(*conditions)
+    )
+    if after is not None:
+        after_date, after_number, after_id = after
+        q = q.filter(
+            or_(
+                JournalEntry.date > after_date,
+                and_(JournalEntry.date == after_date, JournalEntry.number > after_number),
+                and_(
+                    JournalEntry.date == after_date,
+                    JournalEntry.number == after_number,
+                    JournalEntry.id > after_id,
+                ),
+            )
+        )
+
+    entries = (
+        q.order_by(JournalEntry.date, JournalEntry.number, JournalEntry.id)
+        .limit(page_size + 1)
+        .all()
+    )
+    return entries[:page_size], len(entries) > page_size
+
+
+def get_journal_totals(session, conditions):
+    """
+    Jumlah jurnal dan total debit/kredit seluruh jurnal yang cocok dengan
+    filter, dalam satu query agregat.
+    Hasil: (jumlah jurnal, total debit, total kredit), total dalam int sen
+    """
+    debit_sum = sql_sum_cents(case((JournalLine.is_debit == True, JournalLine.amount), else_=0))  # noqa: E712
+    credit_sum = sql_sum_cents(case((JournalLine.is_debit == False, JournalLine.amount), else_=0))  # noqa: E712
+
+    count, debit, credit = (
+        session.query(func.count(func.distinct(JournalEntry.id)), debit_sum, credit_sum)
+        .select_from(JournalEntry)
+        .outerjoin(JournalLine)
+        .filter(*conditions)
+        .one()
+    )
+    return int(count or 0), int(debit or 0), int(credit or 0)
+
+
+# ============================================================
+# EDIT JURNAL (DIFF + OPTIMISTIC LOCKING)
+# ============================================================
+
+class JournalConflict(Exception):
+    """Jurnal sudah diubah atau dihapus user lain sejak form edit dibuka."""
+
+    def __init__(self, entry_id: int, version: int, current_version: int = None):
+        self.entry_id = entry_id
+        self.version = version
+        # None = jurnal sudah dihapus
+        self.current_version = current_version
+        if current_version is None:
+            message = "Jurnal sudah dihapus user lain."
+        else:
+            message = (
+                f"Jurnal sudah diubah user lain (versi {version} -> {current_version}). "
+                "Muat ulang jurnal lalu ulangi perubahan."
+            )
+        super().__init__(message)
+
+
+def update_journal_entry(session, entry_id: int, version: int, entry_date: date, number: str, description: str, lines):
+    """
+    Simpan hasil edit jurnal sebagai diff terhadap data tersimpan: hanya
+    kolom header yang berubah, baris yang berubah di-UPDATE, baris baru
+    di-INSERT, baris yang tidak ada lagi di-DELETE; ringkasan saldo hanya
+    menerima selisihnya. version = versi jurnal saat form edit dibuka; jika
+    sudah berbeda, JournalConflict (tidak ada yang ditulis).
+    lines: [(line_id atau None untuk baris baru, account_id, is_debit, amount)]
+    Hasil: {"header", "updated", "inserted", "deleted"}. Commit oleh pemanggil.
+    """
+    # FOR UPDATE: edit lain atas jurnal ini menunggu sampai transaksi ini selesai
+    entry = session.query(JournalEntry).filter(JournalEntry.id == entry_id).with_for_update().one_or_none()
+    if entry is None or entry.version != version:
+        raise JournalConflict(entry_id, version, entry.version if entry is not None else None)
+
+    old_lines = {
+        line.id: line
+        for line in session.query(JournalLine)
+        .filter(JournalLine.entry_id == entry_id)
+        .order_by(JournalLine.id)
+        .with_for_update()
+    }
+
+    new_values, updated, inserted, kept = [], [], [], set()
+    for line_id, account_id, is_debit, amount in lines:
+        amount = cents_to_decimal(to_cents(amount))
+        new_values.append((account_id, bool(is_debit), amount))
+        line = old_lines.get(line_id)
+        if line is None:
+            inserted.append((account_id, bool(is_debit), amount))
+            continue
+        kept.add(line_id)
+        if (line.account_id, bool(line.is_debit), line.amount) != (account_id, bool(is_debit), amount):
+            updated.append((line, account_id, bool(is_debit), amount))
+    deleted = [line for line_id, line in old_lines.items() if line_id not in kept]
+
+    header = {
+        name: value
+        for name, value in (("date", entry_date), ("number", number), ("description", description))
+        if getattr(entry, name) != value
+    }
+    if not (header or updated or inserted or deleted):
+        return {"header": False, "updated": 0, "inserted": 0, "deleted": 0}
+
+    if entry_date == entry.date:
+        # ringkasan saldo hanya menerima selisih: baris lama keluar (jumlah negatif), baris baru masuk
+        removed = [line for line, *_ in updated] + deleted
+        post_balance_delta(
+            session,
+            entry.date,
+            entry.is_adjustment,
+            [(line.account_id, line.is_debit, -line.amount) for line in removed]
+            + [(account_id, is_debit, amount) for _, account_id, is_debit, amount in updated]
+            + inserted,
+        )
+    else:
+        # pindah tanggal: semua baris keluar dari tanggal lama, masuk ke tanggal baru
+        post_balance_delta(
+            session,
+            entry.date,
+            entry.is_adjustment,
+            [(line.account_id, line.is_debit, line.amount) for line in old_lines.values()],
+            sign=-1,
+        )
+        post_balance_delta(session, entry_date, entry.is_adjustment, new_values)
+
+    for line, account_id, is_debit, amount in updated:
+        line.account_id = account_id
+        line.is_debit = is_debit
+        line.amount = amount
+    for line in deleted:
+        session.delete(line)
+    session.add_all(
+        JournalLine(entry_id=entry_id, account_id=account_id, is_debit=is_debit, amount=amount)
+        for account_id, is_debit, amount in inserted
+    )
+
+    # versi naik juga saat hanya baris yang berubah; WHERE version menjaga
+    # dialect yang mengabaikan FOR UPDATE (SQLite)
+    result = session.execute(
+        update(JournalEntry)
+        .where(JournalEntry.id == entry_id, JournalEntry.version == version)
+        .values(version=JournalEntry.version + 1, **header)
+    )
+    if result.rowcount != 1:
+        raise JournalConflict(entry_id, version, session.query(JournalEntry.version).filter_by(id=entry_id).scalar())
+
+    return {"header": bool(header), "updated": len(updated), "inserted": len(inserted), "deleted": len(deleted)}
+
+
+def build_financial_statements(session, year: int = None, start: date = None, end: date = None, as_of: date = None):
+    """
+    Laporan keuangan satu tahun atau rentang tanggal (jurnal umum +
+    penyesuaian), hanya akun yang memiliki saldo:
+    - income_statement: laporan laba rugi
+    - capital_statement: laporan perubahan modal
+    - balance_sheet: neraca
+    Baris berupa pasangan (nama akun, saldo sesuai normal balance), saldo
+    dan total dalam int sen. Semua bagian diturunkan dari satu vektor saldo
+    get_cumulative_balances(): laba rugi dari mutasi periode ini, aset,
+    liabilitas, dan ekuitas dari saldo akhir periode (termasuk laba ditahan).
+    """
+    import pandas as pd
+
+    balances, retained_earnings = get_cumulative_balances(session, year, start=start, end=end, as_of=as_of)
+
+    # Hanya tampilkan jika saldo tidak nol
+    balances = balances[balances["balance"] != 0]
+    account_type = balances["account_type"]
+
+    # Kategorikan aset/liabilitas berdasarkan kode akun
+    code_int = pd.to_numeric(balances["code"], errors="coerce").fillna(0)
+    is_asset = account_type == "asset"
+    is_liability = account_type == "liability"
+
+    def rows(mask):
+        selected = balances[mask]
+        return list(zip(selected["name"], selected["balance"].tolist()))
+
+    revenue_rows = rows(account_type == "revenue")
+    expense_rows = rows(account_type == "expense")
+    equity_rows = rows(account_type == "equity")
+    if retained_earnings:
+        equity_rows.append((RETAINED_EARNINGS_LABEL, retained_earnings))
+    prive_rows = rows(account_type == "prive")
+    aset_lancar_rows = rows(is_asset & (code_int < 1500))  # Asumsi: kode < 1500 = aset lancar
+    aset_tetap_rows = rows(is_asset & (code_int >= 1500))
+    liab_jangka_pendek_rows = rows(is_liability & (code_int < 2500))  # Asumsi: kode < 2500 = liabilitas jangka pendek
+    liab_jangka_panjang_rows = rows(is_liability & (code_int >= 2500))
+
+    total_revenue = sum_cents(x[1] for x in revenue_rows)
+    total_expense = sum_cents(x[1] for x in expense_rows)
+    net_income = total_revenue - total_expense
+
+    total_equity = sum_cents(x[1] for x in equity_rows)
+    total_prive = sum_cents(x[1] for x in prive_rows)
+
+    # modal akhir = ekuitas + laba bersih - prive
+    modal_akhir = total_equity + net_income - total_prive
+
+    total_aset_lancar = sum_cents(x[1] for x in aset_lancar_rows)
+    total_aset_tetap = sum_cents(x[1] for x in aset_tetap_rows)
+    total_liab_jangka_pendek = sum_cents(x[1] for x in liab_jangka_pendek_rows)
+    total_liab_jangka_panjang = sum_cents(x[1] for x in liab_jangka_panjang_rows)
+    total_liabilitas = total_liab_jangka_pendek + total_liab_jangka_panjang
+
+    return {
+        "income_statement": {
+            "revenue_rows": revenue_rows,
+            "expense_rows": expense_rows,
+            "total_revenue": total_revenue,
+            "total_expense": total_expense,
+            "net_income": net_income,
+        },
+        "capital_statement": {
+            "equity_rows": equity_rows,
+            "prive_rows": prive_rows,
+            "total_equity": total_equity,
+            "total_prive": total_prive,
+            "net_income": net_income,
+            "modal_akhir": modal_akhir,
+        },
+        "balance_sheet": {
+            "aset_lancar_rows": aset_lancar_rows,
+            "aset_tetap_rows": aset_tetap_rows,
+            "liab_jangka_pendek_rows": liab_jangka_pendek_rows,
+            "liab_jangka_panjang_rows": liab_jangka_panjang_rows,
+            "total_aset_lancar": total_aset_lancar,
+            "total_aset_tetap": total_aset_tetap,
+            "total_aktiva": total_aset_lancar + total_aset_tetap,
+            "total_liab_jangka_pendek": total_liab_jangka_pendek,
+            "total_liab_jangka_panjang": total_liab_jangka_panjang,
+            "total_liabilitas": total_liabilitas,
+            "modal_akhir": modal_akhir,
+            # Total pasiva = liabilitas + modal akhir
+            "total_pasiva": total_liabilitas + modal_akhir,
+        },
+    }
+
+
+# ============================================================
+# SALDO AKHIR TAHUN (NERACA KUMULATIF)
+# ============================================================
+
+# akun riil: saldonya dibawa ke tahun berikutnya; akun nominal (pendapatan,
+# beban, prive) ditutup ke laba ditahan di akhir tahun
+PERMANENT_TYPES = ("asset", "liability", "equity")
+
+# baris laba ditahan hasil perhitungan; beda nama dengan akun ekuitas "Laba Ditahan" (302)
+RETAINED_EARNINGS_LABEL = "Laba Ditahan (akumulasi tahun lalu)"
+
+
+def get_opening_balances(session, year: int = None, before: date = None) -> dict:
+    """
+    Saldo awal per akun (debit - kredit kumulatif sebelum tanggal `before`,
+    default 1 Januari `year`, int sen): saldo akhir tahun tersimpan yang
+    terakhir sebelum tahun itu, ditambah ringkasan saldo bulanan tahun-tahun
+    sesudahnya, ditambah satu lookup indeks saldo harian jika `before` bukan
+    awal tahun. Jika tahun sebelumnya sudah ditutup, biayanya tetap berapa
+    pun panjang riwayatnya.
+    Hasil: {account_id: saldo}, akun bersaldo nol boleh tidak ada
+    """
+    before = before or date(year, 1, 1)
+    year = before.year
+    base_year = (
+        session.query(func.max(AccountYearEndBalance.year))
+        .filter(AccountYearEndBalance.year < year)
+        .scalar()
+    )
+
+    balances = {}
+    if base_year is not None:
+        for account_id, balance in session.query(
+            AccountYearEndBalance.account_id, AccountYearEndBalance.balance
+        ).filter(AccountYearEndBalance.year == base_year):
+            balances[account_id] = to_cents(balance)
+
+    if base_year is None or base_year < year - 1:
+        q = (
+            session.query(
+                AccountMonthlyBalance.account_id,
+                sql_sum_cents(AccountMonthlyBalance.debit),
+                sql_sum_cents(AccountMonthlyBalance.credit),
+            )
+            .filter(AccountMonthlyBalance.year < year)
+            .group_by(AccountMonthlyBalance.account_id)
+        )
+        if base_year is not None:
+            q = q.filter(AccountMonthlyBalance.year > base_year)
+        for account_id, debit, credit in q:
+            balances[account_id] = balances.get(account_id, 0) + int(debit or 0) - int(credit or 0)
+
+    if before > date(year, 1, 1):
+        for (account_id, _), (debit, credit) in get_daily_cumulative(session, before - timedelta(days=1)).items():
+            balances[account_id] = balances.get(account_id, 0) + debit - credit
+
+    return balances
+
+
+def get_cumulative_balances(session, year: int = None, start: date = None, end: date = None, as_of: date = None):
+    """
+    Vektor saldo get_account_balances() dengan saldo awal periode ditambahkan
+    ke akun riil (aset, liabilitas, ekuitas), jadi akun riil bersaldo akhir
+    periode. Saldo awal akun nominal menjadi laba ditahan.
+    Hasil: (DataFrame seperti get_account_balances, laba ditahan dalam int sen)
+    """
+    import numpy as np
+
+    start, end = report_period(year, start, end, as_of)
+    balances = get_account_balances(session, start=start, end=end)
+    opening = balances["id"].map(get_opening_balances(session, before=start)).fillna(0).astype(np.int64)
+
+    permanent = balances["account_type"].isin(PERMANENT_TYPES)
+    sign = np.where(balances["account_type"].isin(DEBIT_NORMAL_TYPES), 1, -1)
+    balances["balance"] += (opening * sign).where(permanent, 0)
+
+    # laba ditahan bersaldo kredit: pendapatan - beban - prive tahun-tahun lalu
+    retained_earnings = -int(opening[~permanent].sum())
+    return balances, retained_earnings
+
+
+def build_year_end_balances(session, year: int):
+    """
+    Simpan ulang saldo akhir tahun per akun = saldo awal + mutasi tahun ini.
+    Dipanggil di dalam transaksi penulisan; commit dilakukan oleh pemanggil.
+    Hasil: {account_id: saldo akhir (debit - kredit, int sen)}
+    """
+    session.flush()
+    closing = get_opening_balances(session, year)
+    for account_id, (debit, credit) in get_account_totals(session, year, is_adjustment=None).items():
+        closing[account_id] = closing.get(account_id, 0) + debit - credit
+
+    session.query(AccountYearEndBalance).filter(AccountYearEndBalance.year == year).delete(
+        synchronize_session=False
+    )
+    rows = [
+        {"account_id": account_id, "year": year, "balance": cents_to_decimal(balance)}
+        for account_id, balance in closing.items()
+        if balance
+    ]
+    if rows:
+        session.execute(insert(AccountYearEndBalance), rows)
+    return closing
+
+
+def delete_year_end_balances(session, from_year: int = None):
+    """
+    Hapus saldo akhir tahun `from_year` dan sesudahnya (semua tahun jika
+    None): saldo akhir tahun berikutnya dihitung dari tahun ini.
+    """
+    q = session.query(AccountYearEndBalance)
+    if from_year is not None:
+        q = q.filter(AccountYearEndBalance.year >= from_year)
+    q.delete(synchronize_session=False)
+
+
+def get_closed_years(session, from_year: int = None):
+    q = session.query(ClosingStatus.year).filter(ClosingStatus.is_closed == True)  # noqa: E712
+    if from_year is not None:
+        q = q.filter(ClosingStatus.year >= from_year)
+    return [year for (year,) in q.order_by(ClosingStatus.year)]
+
+
+# ============================================================
+# SNAPSHOT LAPORAN TAHUN YANG SUDAH DITUTUP
+# ============================================================
+
+# Naikkan jika struktur payload laporan berubah. Snapshot versi lama tidak
+# dipakai (laporan dihitung langsung) sampai dibangun ulang oleh
+# "manage.py migrate" atau "manage.py rebuild-snapshots".
+SNAPSHOT_VERSION = 5
+
+SNAPSHOT_REPORTS = (
+    "trial_balance",
+    "adjusted_trial_balance",
+    "income_statement",
+    "capital_statement",
+    "balance_sheet",
+)
+
+
+def compute_reports(
+    session, year: int = None, names=SNAPSHOT_REPORTS, start: date = None, end: date = None, as_of: date = None
+):
+    """Hitung laporan langsung dari data (tanpa snapshot), satu tahun atau rentang tanggal."""
+    start, end = report_period(year, start, end, as_of)
+    reports = {}
+    if "trial_balance" in names:
+        reports["trial_balance"] = compute_trial_balance(session, start=start, end=end)
+    if "adjusted_trial_balance" in names:
+        reports["adjusted_trial_balance"] = build_adjusted_worksheet(session, start=start, end=end)
+    if {"income_statement", "capital_statement", "balance_sheet"} & set(names):
+        statements = build_financial_statements(session, start=start, end=end)
+        reports.update({name: statements[name] for name in statements if name in names})
+    return reports
+
+
+def build_report_snapshots(session, year: int):
+    """
+    Simpan ulang saldo akhir tahun dan semua laporan tahun ini sebagai
+    snapshot. Dipanggil di dalam transaksi penulisan; commit dilakukan oleh
+    pemanggil.
+    """
+    # ringkasan saldo yang belum di-flush harus ikut terhitung
+    session.flush()
+    build_year_end_balances(session, year)
+    reports = compute_reports(session, year)
+
+    delete_report_snapshots(session, year)
+    for name, data in reports.items():
+        session.add(
+            ReportSnapshot(
+                year=year,
+                report=name,
+                payload=json.dumps({"version": SNAPSHOT_VERSION, "data": data}),
+            )
+        )
+    return reports
+
+
+def delete_report_snapshots(session, year: int = None):
+    q = session.query(ReportSnapshot)
+    if year is not None:
+        q = q.filter(ReportSnapshot.year == year)
+    q.delete(synchronize_session=False)
+
+
+def refresh_report_snapshots(session, *years):
+    """
+    Bangun ulang snapshot setelah jurnal tahun-tahun ini berubah. Saldo akhir
+    tahun sesudahnya ikut berubah, jadi semua tahun yang sudah ditutup mulai
+    dari tahun paling awal dibangun ulang berurutan.
+    Hasil: daftar tahun yang dibangun ulang
+    """
+    if not years:
+        return []
+    # status tutup buku yang belum di-flush harus ikut terbaca
+    session.flush()
+    delete_year_end_balances(session, min(years))
+    closed = get_closed_years(session, min(years))
+    for year in closed:
+        build_report_snapshots(session, year)
+    return closed
+
+
+def get_stale_snapshot_years(session):
+    """Tahun yang sudah ditutup tetapi snapshotnya belum lengkap atau versi lama."""
+    current = {}
+    for year, report, payload in session.query(ReportSnapshot.year, ReportSnapshot.report, ReportSnapshot.payload):
+        if json.loads(payload).get("version") == SNAPSHOT_VERSION:
+            current.setdefault(year, set()).add(report)
+    return [year for year in get_closed_years(session) if current.get(year, set()) != set(SNAPSHOT_REPORTS)]
+
+
+def get_reports(session, year: int = None, *names, start: date = None, end: date = None, as_of: date = None):
+    """
+    Ambil laporan untuk tampilan (hanya membaca, tidak commit). Tahun penuh
+    yang sudah ditutup dilayani dari snapshot; snapshot yang belum ada atau
+    versi lama tidak disimpan di sini (hanya saat tutup buku, refresh, dan
+    manage.py), laporannya dihitung langsung. Tahun berjalan dan rentang
+    tanggal lain (start/end atau as_of) juga dihitung langsung.
+    Hasil: {nama laporan: data}
+    """
+    names = names or SNAPSHOT_REPORTS
+
+    start, end = report_period(year, start, end, as_of)
+    year = full_year(start, end)
+    if year is None or not is_year_closed(session, year):
+        return compute_reports(session, names=names, start=start, end=end)
+
+    snapshots = {}
+    for snap in session.query(ReportSnapshot).filter(
+        ReportSnapshot.year == year,
+        ReportSnapshot.report.in_(names),
+    ):
+        payload = json.loads(snap.payload)
+        if payload.get("version") == SNAPSHOT_VERSION:
+            snapshots[snap.report] = payload["data"]
+
+    missing = [name for name in names if name not in snapshots]
+    if missing:
+        # lewat json, agar bentuk data sama dengan snapshot yang tersimpan
+        snapshots.update(json.loads(json.dumps(compute_reports(session, year, names=missing))))
+
+    return snapshots
+
+
+# ============================================================
+# CACHE LAPORAN (KEY: LAPORAN, TAHUN, VERSI DATA)
+# ============================================================
+
+REPORT_CACHE_SIZE = 128
+# Batas umur entri, agar perubahan dari luar proses ini (manage.py, admin
+# Django) tetap terlihat. Perubahan lewat aplikasi langsung menaikkan versi.
+REPORT_CACHE_TTL = 300  # detik
+
+# Commit yang mengubah tabel-tabel ini menaikkan versi data
+LEDGER_TABLES = {
+    "accounting_account",
+    "accounting_journalentry",
+    "accounting_journalline",
+    "accounting_closingstatus",
+    "accounting_accountmonthlybalance",
+    "accounting_accountdailybalance",
+}
+
+
+class ReportCache:
+    """
+    Cache LRU hasil laporan per proses server. Key: (laporan, tahun atau
+    periode, versi data); versi naik setiap commit yang mengubah data buku
+    besar sehingga entri lama tidak pernah terpakai lagi.
+    """
+
+    def __init__(self, maxsize: int = REPORT_CACHE_SIZE, ttl: float = REPORT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data_version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()  # key -> (waktu simpan, nilai)
+        self._lock = threading.Lock()
+
+    def get(self, report: str, year: int, compute):
+        """Ambil laporan dari cache, atau hitung dengan compute() lalu simpan."""
+        with self._lock:
+            key = (report, year, self.data_version)
+            item = self._items.get(key)
+            if item is not None and time.monotonic() - item[0] < self.ttl:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            # versi naik selama compute: hasil disimpan dengan key lama, tidak akan terpakai
+            self._items[key] = (time.monotonic(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def bump_version(self):
+        with self._lock:
+            self.data_version += 1
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "data_version": self.data_version,
+                "size": len(self._items),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+
+def _install_cache_invalidation(cache: ReportCache):
+    """
+    Naikkan versi data cache setelah commit yang menyentuh LEDGER_TABLES.
+    Ditandai saat flush (ORM) atau bulk insert/update/delete, dilepas saat rollback.
+    """
+
+    def before_flush(session, flush_context, instances):
+        for obj in itertools.chain(session.new, session.dirty, session.deleted):
+            if getattr(obj, "__tablename__", None) in LEDGER_TABLES:
+                session.info["ledger_changed"] = True
+                return
+
+    def do_orm_execute(orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            tables = {m.local_table.name for m in orm_execute_state.all_mappers}
+            if tables & LEDGER_TABLES:
+                orm_execute_state.session.info["ledger_changed"] = True
+
+    def after_commit(session):
+        if session.info.pop("ledger_changed", False):
+            cache.bump_version()
+
+    def after_rollback(session):
+        session.info.pop("ledger_changed", None)
+
+    event.listen(Session, "before_flush", before_flush)
+    event.listen(Session, "do_orm_execute", do_orm_execute)
+    event.listen(Session, "after_commit", after_commit)
+    event.listen(Session, "after_rollback", after_rollback)
+
+
+@singleton
+def get_report_cache() -> ReportCache:
+    # satu instance per proses server (app.py dieksekusi ulang setiap rerun)
+    cache = ReportCache()
+    _install_cache_invalidation(cache)
+    return cache
+
+
+def get_cached_reports(session, year: int = None, *names, start: date = None, end: date = None, as_of: date = None):
+    """get_reports() lewat cache laporan; cache hit tidak menyentuh database."""
+    names = names or SNAPSHOT_REPORTS
+    start, end = report_period(year, start, end, as_of)
+    return get_report_cache().get(
+        "reports:" + ",".join(names), (start, end), lambda: get_reports(session, None, *names, start=start, end=end)
+    )
+
+
+def get_cached_trends(session, start_year: int, end_year: int, monthly: bool = False):
+    """get_trend_data() lewat cache laporan."""
+    return get_report_cache().get(
+        f"trends:{end_year}:{'monthly' if monthly else 'yearly'}",
+        start_year,
+        lambda: get_trend_data(session, start_year, end_year, monthly),
+    )
+
+
+def is_year_closed_cached(session, year: int) -> bool:
+    return get_report_cache().get("closed", year, lambda: is_year_closed(session, year))
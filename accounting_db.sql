@@ -73,6 +73,88 @@ INSERT INTO `accounting_account` (`id`, `code`, `name`, `account_type`, `is_acti
 
 -- --------------------------------------------------------
 
+--
+-- Table structure for table `accounting_accountmonthlybalance`
+--
+
+CREATE TABLE `accounting_accountmonthlybalance` (
+  `id` bigint NOT NULL,
+  `account_id` bigint NOT NULL,
+  `year` int NOT NULL,
+  `month` int NOT NULL,
+  `is_adjustment` tinyint(1) NOT NULL,
+  `debit` decimal(18,2) NOT NULL,
+  `credit` decimal(18,2) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+--
+-- Dumping data for table `accounting_accountmonthlybalance`
+--
+
+INSERT INTO `accounting_accountmonthlybalance` (`id`, `account_id`, `year`, `month`, `is_adjustment`, `debit`, `credit`) VALUES
+(1, 1, 2025, 1, 0, '5000000.00', '0.00'),
+(2, 2, 2025, 1, 0, '73000000.00', '33000000.00'),
+(3, 3, 2025, 1, 0, '2000000.00', '0.00'),
+(4, 4, 2025, 1, 0, '0.00', '5000000.00'),
+(5, 5, 2025, 1, 0, '20000000.00', '0.00'),
+(6, 9, 2025, 1, 0, '5000000.00', '5000000.00'),
+(7, 14, 2025, 1, 0, '0.00', '50000000.00'),
+(8, 17, 2025, 1, 0, '0.00', '12000000.00'),
+(9, 18, 2025, 1, 0, '0.00', '3500000.00'),
+(10, 19, 2025, 1, 0, '0.00', '2500000.00'),
+(11, 21, 2025, 1, 0, '6000000.00', '0.00'),
+(12, 7, 2025, 12, 1, '0.00', '2000000.00'),
+(13, 8, 2025, 12, 1, '0.00', '1000000.00'),
+(14, 25, 2025, 12, 1, '1000000.00', '0.00'),
+(15, 29, 2025, 12, 1, '2000000.00', '0.00');
+
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `accounting_accountdailybalance`
+--
+
+CREATE TABLE `accounting_accountdailybalance` (
+  `id` bigint NOT NULL,
+  `account_id` bigint NOT NULL,
+  `date` date NOT NULL,
+  `is_adjustment` tinyint(1) NOT NULL,
+  `debit` decimal(18,2) NOT NULL,
+  `credit` decimal(18,2) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+--
+-- Dumping data for table `accounting_accountdailybalance`
+--
+
+INSERT INTO `accounting_accountdailybalance` (`id`, `account_id`, `date`, `is_adjustment`, `debit`, `credit`) VALUES
+(1, 2, '2025-01-02', 0, '50000000.00', '0.00'),
+(2, 14, '2025-01-02', 0, '0.00', '50000000.00'),
+(3, 2, '2025-01-03', 0, '50000000.00', '20000000.00'),
+(4, 5, '2025-01-03', 0, '20000000.00', '0.00'),
+(5, 1, '2025-01-05', 0, '5000000.00', '0.00'),
+(6, 9, '2025-01-05', 0, '0.00', '5000000.00'),
+(7, 2, '2025-01-07', 0, '55000000.00', '20000000.00'),
+(8, 4, '2025-01-07', 0, '0.00', '5000000.00'),
+(9, 2, '2025-01-08', 0, '67000000.00', '20000000.00'),
+(10, 17, '2025-01-08', 0, '0.00', '12000000.00'),
+(11, 2, '2025-01-10', 0, '70500000.00', '20000000.00'),
+(12, 18, '2025-01-10', 0, '0.00', '3500000.00'),
+(13, 2, '2025-01-12', 0, '70500000.00', '22000000.00'),
+(14, 3, '2025-01-12', 0, '2000000.00', '0.00'),
+(15, 2, '2025-01-15', 0, '70500000.00', '27000000.00'),
+(16, 9, '2025-01-15', 0, '5000000.00', '5000000.00'),
+(17, 2, '2025-01-18', 0, '73000000.00', '27000000.00'),
+(18, 19, '2025-01-18', 0, '0.00', '2500000.00'),
+(19, 2, '2025-01-21', 0, '73000000.00', '33000000.00'),
+(20, 21, '2025-01-21', 0, '6000000.00', '0.00'),
+(21, 7, '2025-12-31', 1, '0.00', '2000000.00'),
+(22, 8, '2025-12-31', 1, '0.00', '1000000.00'),
+(23, 25, '2025-12-31', 1, '1000000.00', '0.00'),
+(24, 29, '2025-12-31', 1, '2000000.00', '0.00');
+
+-- --------------------------------------------------------
+
 --
 -- Table structure for table `accounting_closingstatus`
 --
@@ -125,7 +207,8 @@ CREATE TABLE `accounting_journalentry` (
   `is_adjustment` tinyint(1) NOT NULL,
   `created_at` datetime(6) NOT NULL,
   `company_id` bigint DEFAULT NULL,
-  `created_by_id` int DEFAULT NULL
+  `created_by_id` int DEFAULT NULL,
+  `version` int NOT NULL DEFAULT '1'
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
 --
@@ -193,6 +276,33 @@ INSERT INTO `accounting_journalline` (`id`, `is_debit`, `amount`, `tax_ppn`, `ac
 
 -- --------------------------------------------------------
 
+--
+-- Table structure for table `accounting_accountyearendbalance`
+--
+
+CREATE TABLE `accounting_accountyearendbalance` (
+  `id` bigint NOT NULL,
+  `account_id` bigint NOT NULL,
+  `year` int NOT NULL,
+  `balance` decimal(18,2) NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `accounting_reportsnapshot`
+--
+
+CREATE TABLE `accounting_reportsnapshot` (
+  `id` bigint NOT NULL,
+  `year` int NOT NULL,
+  `report` varchar(50) NOT NULL,
+  `payload` longtext NOT NULL,
+  `created_at` datetime(6) DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Table structure for table `auth_group`
 --
@@ -451,6 +561,28 @@ ALTER TABLE `accounting_account`
   ADD PRIMARY KEY (`id`),
   ADD UNIQUE KEY `code` (`code`);
 
+--
+-- Indexes for table `accounting_accountmonthlybalance`
+--
+ALTER TABLE `accounting_accountmonthlybalance`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `accounting_accountmonthlybalance_account_year_month_adj_uniq` (`account_id`,`year`,`month`,`is_adjustment`),
+  ADD KEY `accounting_accountmonthlybalance_year_cover_idx` (`year`,`is_adjustment`,`account_id`,`debit`,`credit`);
+
+--
+-- Indexes for table `accounting_accountdailybalance`
+--
+ALTER TABLE `accounting_accountdailybalance`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `accounting_accountdailybalance_account_adj_date_uniq` (`account_id`,`is_adjustment`,`date`);
+
+--
+-- Indexes for table `accounting_accountyearendbalance`
+--
+ALTER TABLE `accounting_accountyearendbalance`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `accounting_accountyearendbalance_year_account_uniq` (`year`,`account_id`);
+
 --
 -- Indexes for table `accounting_closingstatus`
 --
@@ -470,15 +602,24 @@ ALTER TABLE `accounting_company`
 ALTER TABLE `accounting_journalentry`
   ADD PRIMARY KEY (`id`),
   ADD KEY `accounting_journalen_company_id_9e360981_fk_accountin` (`company_id`),
-  ADD KEY `accounting_journalentry_created_by_id_60f500e8_fk_auth_user_id` (`created_by_id`);
+  ADD KEY `accounting_journalentry_created_by_id_60f500e8_fk_auth_user_id` (`created_by_id`),
+  ADD KEY `accounting_journalentry_date_adj_idx` (`date`,`is_adjustment`,`id`),
+  ADD KEY `accounting_journalentry_adj_date_number_idx` (`is_adjustment`,`date`,`number`,`id`);
 
 --
 -- Indexes for table `accounting_journalline`
 --
 ALTER TABLE `accounting_journalline`
   ADD PRIMARY KEY (`id`),
-  ADD KEY `accounting_journalli_account_id_2355bfed_fk_accountin` (`account_id`),
-  ADD KEY `accounting_journalli_entry_id_a1a8fdef_fk_accountin` (`entry_id`);
+  ADD KEY `accounting_journalline_account_cover_idx` (`account_id`,`entry_id`,`is_debit`,`amount`),
+  ADD KEY `accounting_journalline_entry_cover_idx` (`entry_id`,`account_id`,`is_debit`,`amount`);
+
+--
+-- Indexes for table `accounting_reportsnapshot`
+--
+ALTER TABLE `accounting_reportsnapshot`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `accounting_reportsnapshot_year_report_uniq` (`year`,`report`);
 
 --
 -- Indexes for table `auth_group`
@@ -563,6 +704,24 @@ ALTER TABLE `django_session`
 ALTER TABLE `accounting_account`
   MODIFY `id` bigint NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=31;
 
+--
+-- AUTO_INCREMENT for table `accounting_accountmonthlybalance`
+--
+ALTER TABLE `accounting_accountmonthlybalance`
+  MODIFY `id` bigint NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=16;
+
+--
+-- AUTO_INCREMENT for table `accounting_accountdailybalance`
+--
+ALTER TABLE `accounting_accountdailybalance`
+  MODIFY `id` bigint NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=25;
+
+--
+-- AUTO_INCREMENT for table `accounting_accountyearendbalance`
+--
+ALTER TABLE `accounting_accountyearendbalance`
+  MODIFY `id` bigint NOT NULL AUTO_INCREMENT;
+
 --
 -- AUTO_INCREMENT for table `accounting_closingstatus`
 --
@@ -587,6 +746,12 @@ ALTER TABLE `accounting_journalentry`
 ALTER TABLE `accounting_journalline`
   MODIFY `id` bigint NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=51;
 
+--
+-- AUTO_INCREMENT for table `accounting_reportsnapshot`
+--
+ALTER TABLE `accounting_reportsnapshot`
+  MODIFY `id` bigint NOT NULL AUTO_INCREMENT;
+
 --
 -- AUTO_INCREMENT for table `auth_group`
 --
@@ -645,6 +810,18 @@ ALTER TABLE `django_migrations`
 -- Constraints for dumped tables
 --
 
+--
+-- Constraints for table `accounting_accountdailybalance`
+--
+ALTER TABLE `accounting_accountdailybalance`
+  ADD CONSTRAINT `accounting_accountda_account_id_fk_accountin` FOREIGN KEY (`account_id`) REFERENCES `accounting_account` (`id`);
+
+--
+-- Constraints for table `accounting_accountmonthlybalance`
+--
+ALTER TABLE `accounting_accountmonthlybalance`
+  ADD CONSTRAINT `accounting_accountmo_account_id_fk_accountin` FOREIGN KEY (`account_id`) REFERENCES `accounting_account` (`id`);
+
 --
 -- Constraints for table `accounting_journalentry`
 --
@@ -0,0 +1,310 @@
+"""
+Autentikasi user Django (hash pbkdf2_sha256) dan sesi login bertanda tangan.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from db import get_session, get_setting, singleton
+from models import LoginSession, User
+
+
+# ============================================================
+# AUTENTIKASI (COCOK DENGAN HASH PASSWORD DJANGO)
+# ============================================================
+
+def verify_django_password(raw_password: str, encoded: str) -> bool:
+    """
+    Verifikasi hash password Django pbkdf2_sha256.
+    Contoh format:
+    pbkdf2_sha256$600000$salt$hash
+    """
+    try:
+        algorithm, iterations_str, salt, hash_value = encoded.split("$", 3)
+    except ValueError:
+        return False
+
+    if algorithm != "pbkdf2_sha256":
+        return False
+
+    try:
+        iterations = int(iterations_str)
+    except ValueError:
+        return False
+
+    dk = hashlib.pbkdf2_hmac(
+        "sha256",
+        raw_password.encode("utf-8"),
+        salt.encode("utf-8"),
+        iterations,
+    )
+    computed = base64.b64encode(dk).decode("ascii").strip()
+    return hmac.compare_digest(computed, hash_value)
+
+
+def make_django_password(raw_password: str, salt: str = None, iterations: int = 600000) -> str:
+    """Buat hash pbkdf2_sha256 berformat Django (bisa dibaca check_password Django)."""
+    if salt is None:
+        alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+        salt = "".join(secrets.choice(alphabet) for _ in range(22))
+    dk = hashlib.pbkdf2_hmac("sha256", raw_password.encode("utf-8"), salt.encode("utf-8"), iterations)
+    return f"pbkdf2_sha256${iterations}${salt}${base64.b64encode(dk).decode('ascii').strip()}"
+
+
+class LoginBusy(Exception):
+    """Antrean verifikasi password penuh; user diminta mencoba lagi."""
+
+
+class PasswordHasher:
+    """
+    Verifikasi password di thread pool terbatas. pbkdf2_hmac melepas GIL,
+    jadi hash berjalan paralel tanpa menahan thread script Streamlit lain.
+    max_pending membatasi job yang berjalan + mengantre; di atas itu LoginBusy.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 8, wait: float = 0.5):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.wait = wait
+        self.rejected = 0
+        # verify() dipanggil bersamaan dari banyak thread script Streamlit
+        self._lock = threading.Lock()
+
+    def verify(self, raw_password: str, encoded: str) -> bool:
+        if not self.slots.acquire(timeout=self.wait):
+            with self._lock:
+                self.rejected += 1
+            raise LoginBusy()
+        try:
+            future = self.executor.submit(verify_django_password, raw_password, encoded)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future.result()
+
+
+@singleton
+def get_password_hasher() -> PasswordHasher:
+    # satu pool per proses server
+    return PasswordHasher(
+        workers=int(get_setting("PASSWORD_HASH_WORKERS", 4)),
+        max_pending=int(get_setting("PASSWORD_HASH_MAX_PENDING", 8)),
+        wait=float(get_setting("PASSWORD_HASH_WAIT", 0.5)),
+    )
+
+
+def authenticate_email(email: str, password: str):
+    """
+    Kembalikan User jika email/password cocok, None jika tidak.
+    Raise LoginBusy jika terlalu banyak login diproses bersamaan.
+    """
+    with get_session() as session:
+        user = (
+            session.query(User)
+            .filter(User.email == email, User.is_active == True)  # noqa: E712
+            .first()
+        )
+
+    # session ditutup dulu: koneksi kembali ke pool selama hash dihitung
+    if not user:
+        return None
+
+    if get_password_hasher().verify(password, user.password):
+        return user
+    return None
+
+
+def session_user(user: User) -> dict:
+    """Data user yang disimpan di st.session_state["user"]."""
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "is_staff": bool(user.is_staff or user.is_superuser),
+    }
+
+
+# ============================================================
+# SESI LOGIN (TOKEN BERTANDA TANGAN HMAC)
+# ============================================================
+
+# nama cookie browser yang menyimpan token sesi
+SESSION_COOKIE = "accounting_sid"
+
+
+def _utcnow() -> datetime:
+    # expire_date django_session disimpan dalam UTC tanpa zona waktu
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class LoginSessionStore:
+    """
+    Token sesi "<session_key>.<expires>.<signature>" disimpan di cookie
+    browser (SESSION_COOKIE, bukan di URL) sehingga refresh/reconnect tidak
+    perlu login ulang. Token yang umurnya lewat `rotate_after` detik diganti
+    (rotate) saat dipakai memulihkan login; token lama masih berlaku
+    `recheck` detik lagi, selama browser belum menerima cookie baru.
+
+    Tanda tangan dan masa berlaku dicek di memori (mikrodetik); baris
+    django_session hanya dibaca ulang setiap `recheck` detik, sehingga
+    Logout (hapus baris) tetap mencabut token di semua proses.
+    """
+
+    def __init__(
+        self, secret: str, max_age: int = 43200, recheck: int = 60, rotate_after: int = None, maxsize: int = 1024
+    ):
+        self.secret = secret.encode("utf-8")
+        self.max_age = max_age
+        self.recheck = recheck
+        self.rotate_after = max_age // 2 if rotate_after is None else rotate_after
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        # session_key -> (user dict, waktu cek database terakhir)
+        self._validated = OrderedDict()
+
+    def _sign(self, payload: str) -> str:
+        digest = hmac.new(self.secret, payload.encode("ascii"), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+    def _parse(self, token: str):
+        """Kembalikan session_key jika tanda tangan valid dan belum kedaluwarsa."""
+        try:
+            session_key, expires_str, signature = token.split(".")
+            expires = int(expires_str)
+        except (AttributeError, ValueError):
+            return None
+        if not hmac.compare_digest(signature, self._sign(f"{session_key}.{expires}")):
+            return None
+        if expires < time.time():
+            return None
+        return session_key
+
+    def create(self, session, user: User) -> str:
+        """
+        Simpan sesi baru (belum commit) dan kembalikan tokennya. Panggil
+        remember() setelah commit berhasil.
+        """
+        return self._issue(session, user.id)
+
+    def needs_rotation(self, token: str) -> bool:
+        """True jika token sudah berumur lebih dari rotate_after detik."""
+        try:
+            expires = int(token.split(".")[1])
+        except (AttributeError, IndexError, ValueError):
+            return False
+        return expires - time.time() < self.max_age - self.rotate_after
+
+    def rotate(self, session, token: str, user: dict) -> str:
+        """
+        Ganti token yang baru lolos validate() dengan token baru (belum
+        commit). Sesi token lama dipendekkan menjadi `recheck` detik, bukan
+        langsung dihapus: jika browser belum sempat menyimpan cookie baru,
+        refresh berikutnya masih bisa login dengan token lama.
+        """
+        session_key = self._parse(token)
+        if session_key is not None:
+            grace = _utcnow() + timedelta(seconds=self.recheck)
+            session.query(LoginSession).filter(
+                LoginSession.session_key == session_key, LoginSession.expire_date > grace
+            ).update({LoginSession.expire_date: grace}, synchronize_session=False)
+        return self._issue(session, user["id"])
+
+    def _issue(self, session, user_id: int) -> str:
+        session_key = secrets.token_hex(16)
+        expires = int(time.time()) + self.max_age
+        session.query(LoginSession).filter(LoginSession.expire_date < _utcnow()).delete(
+            synchronize_session=False
+        )
+        session.add(
+            LoginSession(
+                session_key=session_key,
+                session_data=json.dumps({"user_id": user_id}),
+                expire_date=datetime.fromtimestamp(expires, timezone.utc).replace(tzinfo=None),
+            )
+        )
+        return f"{session_key}.{expires}.{self._sign(f'{session_key}.{expires}')}"
+
+    def remember(self, token: str, user: dict):
+        """Tandai token baru sebagai valid di memori; hanya setelah commit berhasil."""
+        session_key = self._parse(token)
+        if session_key is None:
+            return
+        with self._lock:
+            self._remember(session_key, user)
+
+    def _remember(self, session_key, user):
+        self._validated[session_key] = (user, time.monotonic())
+        self._validated.move_to_end(session_key)
+        while len(self._validated) > self.maxsize:
+            self._validated.popitem(last=False)
+
+    def validate(self, token: str):
+        """Kembalikan dict user untuk token yang masih berlaku, None jika tidak."""
+        session_key = self._parse(token)
+        if session_key is None:
+            return None
+
+        with self._lock:
+            cached = self._validated.get(session_key)
+        if cached and time.monotonic() - cached[1] < self.recheck:
+            return cached[0]
+
+        with get_session() as session:
+            row = (
+                session.query(LoginSession)
+                .filter(LoginSession.session_key == session_key, LoginSession.expire_date > _utcnow())
+                .first()
+            )
+            user = None
+            if row:
+                try:
+                    user_id = json.loads(row.session_data)["user_id"]
+                except (ValueError, KeyError, TypeError):
+                    user_id = None
+                user = (
+                    session.query(User)
+                    .filter(User.id == user_id, User.is_active == True)  # noqa: E712
+                    .first()
+                )
+
+        with self._lock:
+            if user is None:
+                self._validated.pop(session_key, None)
+                return None
+            self._remember(session_key, session_user(user))
+        return session_user(user)
+
+    def revoke(self, session, token: str):
+        """Hapus sesi di server (belum commit) sehingga token tidak berlaku lagi."""
+        session_key = self._parse(token)
+        if session_key is None:
+            return
+        with self._lock:
+            self._validated.pop(session_key, None)
+        session.query(LoginSession).filter(LoginSession.session_key == session_key).delete(
+            synchronize_session=False
+        )
+
+
+@singleton
+def get_login_sessions() -> LoginSessionStore:
+    secret = get_setting("SECRET_KEY")
+    if not secret:
+        # tanpa SECRET_KEY token hanya berlaku selama proses server hidup
+        secret = secrets.token_urlsafe(32)
+    max_age = int(get_setting("LOGIN_SESSION_AGE", 43200))
+    return LoginSessionStore(
+        secret,
+        max_age=max_age,
+        recheck=int(get_setting("LOGIN_SESSION_RECHECK", 60)),
+        # default: token diganti setelah setengah masa berlakunya
+        rotate_after=int(get_setting("LOGIN_SESSION_ROTATE", max_age // 2)),
+    )
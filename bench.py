@@ -0,0 +1,315 @@
+"""
+Benchmark fungsi laporan dengan buku besar sintetis (dipakai "manage.py bench").
+
+Database benchmark dikosongkan dan diisi ulang per ukuran data, jadi selalu
+pakai database terpisah (default: file SQLite sementara). Hasil ditulis ke
+JSON supaya bisa dibandingkan antar commit.
+"""
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import time
+from datetime import date, datetime
+
+from sqlalchemy import create_engine, insert
+
+import accounting
+from db import get_engine, get_session
+from models import Account, Base, JournalEntry, JournalLine
+
+# dump contoh di folder repo, tidak bergantung direktori kerja
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "accounting_db.sql")
+
+# jumlah akun per tipe, default sama seperti accounting_db.sql
+BENCH_ACCOUNTS = {
+    "asset": 8,
+    "liability": 5,
+    "equity": 2,
+    "prive": 1,
+    "revenue": 4,
+    "expense": 10,
+}
+
+# digit pertama kode akun per tipe (kode 4 digit, mis. 1001 = aset pertama)
+ACCOUNT_CODE_PREFIX = {
+    "asset": 1,
+    "liability": 2,
+    "equity": 3,
+    "prive": 4,
+    "revenue": 5,
+    "expense": 6,
+}
+
+# tahun terakhir data sintetis (tetap, supaya hasil bisa dibandingkan)
+BENCH_YEAR = 2025
+
+# baris jurnal per executemany saat mengisi data
+_INSERT_BATCH = 10000
+
+
+# ============================================================
+# DATA SINTETIS
+# ============================================================
+
+def reset_database():
+    """Hapus lalu buat ulang semua tabel di database benchmark."""
+    Base.metadata.drop_all(get_engine())
+    Base.metadata.create_all(get_engine())
+
+
+def _entry_lines(rng, account_ids, count):
+    """Baris satu jurnal yang balance: (account_id, is_debit, sen)."""
+    debit_count = max(1, count // 2)
+    credit_count = count - debit_count
+
+    debits = [rng.randint(1_000_00, 10_000_000_00) for _ in range(debit_count)]
+    total = sum(debits)
+    # total debit dipecah acak ke baris kredit
+    cuts = sorted(rng.sample(range(1, total), credit_count - 1))
+    credits = [b - a for a, b in zip([0] + cuts, cuts + [total])]
+
+    accounts = rng.choices(account_ids, k=count)
+    return [(a, True, c) for a, c in zip(accounts, debits)] + [
+        (a, False, c) for a, c in zip(accounts[debit_count:], credits)
+    ]
+
+
+def generate_ledger(
+    session,
+    accounts_per_type: dict = None,
+    entries_per_year: int = 1000,
+    lines_per_entry: int = 2,
+    adjustment_ratio: float = 0.05,
+    years: int = 1,
+    seed: int = 0,
+):
+    """
+    Isi database kosong dengan akun dan jurnal acak (tetapi deterministik
+    untuk seed yang sama), lalu bangun ringkasan saldo bulanan dan indeks
+    saldo harian.
+    Hasil: {"accounts", "entries", "lines", "year"}
+    """
+    if lines_per_entry < 2:
+        raise ValueError("lines_per_entry minimal 2.")
+    accounts_per_type = accounts_per_type or BENCH_ACCOUNTS
+
+    rng = random.Random(seed)
+
+    accounts = []
+    for account_type, count in accounts_per_type.items():
+        if count > 999:
+            raise ValueError(f"Maksimal 999 akun per tipe ({account_type}: {count}).")
+        prefix = ACCOUNT_CODE_PREFIX[account_type]
+        for i in range(1, count + 1):
+            accounts.append(
+                {
+                    "id": len(accounts) + 1,
+                    "code": f"{prefix}{i:03d}",
+                    "name": f"{account_type.title()} {i}",
+                    "account_type": account_type,
+                    "is_active": True,
+                }
+            )
+    session.execute(insert(Account), accounts)
+    account_ids = [a["id"] for a in accounts]
+
+    entries = []
+    lines = []
+    entry_count = line_count = 0
+
+    def flush():
+        if entries:
+            session.execute(insert(JournalEntry), entries)
+        if lines:
+            session.execute(insert(JournalLine), lines)
+        entries.clear()
+        lines.clear()
+
+    for year in range(BENCH_YEAR - years + 1, BENCH_YEAR + 1):
+        first_day = date(year, 1, 1).toordinal()
+        days = date(year, 12, 31).toordinal() - first_day + 1
+        for n in range(1, entries_per_year + 1):
+            entry_count += 1
+            is_adjustment = rng.random() < adjustment_ratio
+            entries.append(
+                {
+                    "id": entry_count,
+                    "date": date.fromordinal(first_day + rng.randrange(days)),
+                    "number": f"{'AJP' if is_adjustment else 'JU'}-{year}-{n:06d}",
+                    "description": f"Transaksi sintetis {n}",
+                    "is_adjustment": is_adjustment,
+                }
+            )
+            for account_id, is_debit, cents in _entry_lines(rng, account_ids, lines_per_entry):
+                line_count += 1
+                lines.append(
+                    {
+                        "id": line_count,
+                        "entry_id": entry_count,
+                        "account_id": account_id,
+                        "is_debit": is_debit,
+                        "amount": accounting.cents_to_decimal(cents),
+                    }
+                )
+            if len(lines) >= _INSERT_BATCH:
+                flush()
+    flush()
+
+    accounting.rebuild_account_balances(session)
+    accounting.rebuild_daily_balances(session)
+    session.commit()
+    return {"accounts": len(accounts), "entries": entry_count, "lines": line_count, "year": BENCH_YEAR}
+
+
+def load_fixture(session, path: str = FIXTURE_PATH):
+    """
+    Isi database kosong dengan data accounting_db.sql (dump MySQL). INSERT
+    untuk tabel di models dijalankan dulu di SQLite memori, lalu barisnya
+    disalin lewat SQLAlchemy supaya tipe (boolean, tanggal) cocok di
+    dialect mana pun.
+    Hasil: ringkasan seperti generate_ledger (tahun = tahun jurnal terakhir).
+    """
+    with open(path, encoding="utf-8") as f:
+        dump = f.read()
+
+    staging = create_engine("sqlite://")
+    Base.metadata.create_all(staging)
+    with staging.begin() as conn:
+        for match in re.finditer(r"INSERT INTO `(\w+)` .*?\);\n", dump, re.S):
+            if match.group(1) in Base.metadata.tables:
+                conn.exec_driver_sql(match.group(0).replace("\\'", "''"))
+
+    with staging.connect() as conn:
+        for table in Base.metadata.sorted_tables:
+            rows = [dict(row) for row in conn.execute(table.select()).mappings()]
+            if rows:
+                session.execute(table.insert(), rows)
+    session.commit()
+
+    last_date = session.query(JournalEntry.date).order_by(JournalEntry.date.desc()).limit(1).scalar()
+    return {
+        "accounts": session.query(Account).count(),
+        "entries": session.query(JournalEntry).count(),
+        "lines": session.query(JournalLine).count(),
+        "year": last_date.year if last_date else BENCH_YEAR,
+    }
+
+
+# ============================================================
+# FUNGSI YANG DIUKUR
+# ============================================================
+
+def _ledger_frames(session, year):
+    # jalur halaman Buku Besar: query + DataFrame + format per akun
+    for lines in accounting.get_ledger_data(session, year).values():
+        accounting.format_money_columns(accounting.build_ledger_frame(lines), *accounting.LEDGER_MONEY_COLUMNS)
+
+
+def _journal_conditions(year):
+    return accounting.journal_filter_conditions(False, date(year, 1, 1), date(year, 12, 31))
+
+
+BENCH_FUNCTIONS = {
+    "compute_trial_balance": accounting.compute_trial_balance,
+    "build_adjusted_trial_balance": accounting.build_adjusted_trial_balance,
+    "get_income_statement_data": accounting.get_income_statement_data,
+    "get_balance_sheet_data": accounting.get_balance_sheet_data,
+    "build_financial_statements": accounting.build_financial_statements,
+    "get_ledger_data": accounting.get_ledger_data,
+    "ledger_second_half": lambda session, year: accounting.get_ledger_data(session, start=date(year, 7, 1)),
+    "trial_balance_q3": lambda session, year: accounting.compute_trial_balance(
+        session, start=date(year, 7, 1), end=date(year, 9, 30)
+    ),
+    "financial_statements_as_of": lambda session, year: accounting.build_financial_statements(
+        session, as_of=date(year, 6, 30)
+    ),
+    "trend_data_10y": lambda session, year: accounting.get_trend_data(session, year - 9, year),
+    "trend_data_10y_monthly": lambda session, year: accounting.get_trend_data(session, year - 9, year, True),
+    "ledger_frames": _ledger_frames,
+    "journal_first_page": lambda session, year: accounting.fetch_journal_page(session, _journal_conditions(year)),
+    "journal_totals": lambda session, year: accounting.get_journal_totals(session, _journal_conditions(year)),
+}
+
+
+def time_function(fn, year: int, repeat: int = 5):
+    """Waktu (ms) tiap putaran, masing-masing dengan session baru; satu putaran pemanasan dibuang."""
+    runs = []
+    for i in range(repeat + 1):
+        with get_session() as session:
+            t0 = time.perf_counter()
+            fn(session, year)
+            elapsed = (time.perf_counter() - t0) * 1000
+        if i:
+            runs.append(round(elapsed, 3))
+    return runs
+
+
+def run_dataset(name: str, dataset: dict, functions, repeat: int):
+    results = []
+    for function in functions:
+        runs = time_function(BENCH_FUNCTIONS[function], dataset["year"], repeat)
+        results.append(
+            {
+                "dataset": name,
+                "function": function,
+                "runs_ms": runs,
+                "min_ms": min(runs),
+                "median_ms": round(statistics.median(runs), 3),
+            }
+        )
+    return results
+
+
+# ============================================================
+# HASIL
+# ============================================================
+
+def _git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def bench_metadata(config: dict) -> dict:
+    import pandas
+    import sqlalchemy
+
+    return {
+        "commit": _git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "pandas": pandas.__version__,
+        "dialect": get_engine().dialect.name,
+        "config": config,
+    }
+
+
+# konfigurasi yang membentuk data; hasil hanya sebanding jika semuanya sama
+DATASET_CONFIG_KEYS = ("accounts", "lines_per_entry", "adjustment_ratio", "years", "seed")
+
+
+def compare_results(old: dict, new: dict):
+    """
+    Bandingkan median per (dataset, fungsi) dengan hasil sebelumnya.
+    Hasil: daftar (dataset, fungsi, median lama, median baru, rasio baru/lama).
+    """
+    previous = {(r["dataset"], r["function"]): r["median_ms"] for r in old["results"]}
+    rows = []
+    for r in new["results"]:
+        before = previous.get((r["dataset"], r["function"]))
+        if before:
+            rows.append((r["dataset"], r["function"], before, r["median_ms"], r["median_ms"] / before))
+    return rows
+
+
+def write_results(results: dict, path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
@@ -0,0 +1,323 @@
+"""
+Ekspor laporan ke CSV / JSON tanpa Streamlit (dipakai "manage.py report"
+untuk pembuatan laporan batch, misalnya lewat cron), dan ekspor streaming
+seluruh baris jurnal ke CSV / Parquet ("manage.py export-journal").
+
+Jumlah uang ditulis sebagai teks desimal rupiah ("1234.56") agar tetap
+eksak di CSV maupun JSON; di Parquet sebagai decimal(18, 2).
+"""
+import csv
+import itertools
+import json
+from datetime import date, datetime
+
+from accounting import (
+    adjusted_trial_balance_from_worksheet,
+    cents_to_decimal,
+    full_year,
+    get_ledger_data,
+    get_reports,
+)
+from models import Account, Company, JournalEntry, JournalLine
+
+EXPORT_REPORTS = ("trial_balance", "adjusted_trial_balance", "ledger", "financial_statements")
+
+
+def money(cents: int) -> str:
+    return str(cents_to_decimal(cents))
+
+
+def export_trial_balance(session, start: date, end: date):
+    rows, total_debit, total_credit = get_reports(session, None, "trial_balance", start=start, end=end)["trial_balance"]
+    return {
+        "columns": ["code", "name", "debit", "credit"],
+        "rows": [
+            {"code": r["Kode Akun"], "name": r["Nama Akun"], "debit": money(r["Debit"]), "credit": money(r["Kredit"])}
+            for r in rows
+        ],
+        "totals": {"debit": money(total_debit), "credit": money(total_credit)},
+    }
+
+
+def export_adjusted_trial_balance(session, start: date, end: date):
+    worksheet = get_reports(session, None, "adjusted_trial_balance", start=start, end=end)["adjusted_trial_balance"]
+    rows, total_debit, total_credit = adjusted_trial_balance_from_worksheet(worksheet)
+    by_code = {item["code"]: item for item in worksheet}
+
+    return {
+        "columns": ["code", "name", "unadjusted", "adjustment", "debit", "credit"],
+        "rows": [
+            {
+                "code": r["Kode Akun"],
+                "name": r["Nama Akun"],
+                "unadjusted": money(by_code[r["Kode Akun"]]["unadjusted"]),
+                "adjustment": money(by_code[r["Kode Akun"]]["adjustment"]),
+                "debit": money(r["Debit"]),
+                "credit": money(r["Kredit"]),
+            }
+            for r in rows
+        ],
+        "totals": {"debit": money(total_debit), "credit": money(total_credit)},
+    }
+
+
+def export_ledger(session, start: date, end: date):
+    accounts = {acc.id: acc for acc in session.query(Account).order_by(Account.code)}
+    ledger = get_ledger_data(session, start=start, end=end)
+
+    rows = []
+    for account_id, acc in accounts.items():
+        for line in ledger.get(account_id, []):
+            rows.append(
+                {
+                    "account_code": acc.code,
+                    "account_name": acc.name,
+                    "date": line["date"].isoformat(),
+                    "number": line["number"],
+                    "description": line["description"],
+                    "debit": money(line["amount"] if line["is_debit"] else 0),
+                    "credit": money(line["amount"] if not line["is_debit"] else 0),
+                    "balance": money(line["saldo"]),
+                }
+            )
+
+    return {
+        "columns": ["account_code", "account_name", "date", "number", "description", "debit", "credit", "balance"],
+        "rows": rows,
+        "totals": {},
+    }
+
+
+# (laporan, bagian, key baris, key total) sesuai urutan di halaman Laporan Keuangan
+STATEMENT_SECTIONS = [
+    ("income_statement", "pendapatan", "revenue_rows", "total_revenue"),
+    ("income_statement", "beban", "expense_rows", "total_expense"),
+    ("income_statement", "laba_bersih", None, "net_income"),
+    ("capital_statement", "ekuitas", "equity_rows", "total_equity"),
+    ("capital_statement", "prive", "prive_rows", "total_prive"),
+    ("capital_statement", "modal_akhir", None, "modal_akhir"),
+    ("balance_sheet", "aset_lancar", "aset_lancar_rows", "total_aset_lancar"),
+    ("balance_sheet", "aset_tetap", "aset_tetap_rows", "total_aset_tetap"),
+    ("balance_sheet", "total_aktiva", None, "total_aktiva"),
+    ("balance_sheet", "liabilitas_jangka_pendek", "liab_jangka_pendek_rows", "total_liab_jangka_pendek"),
+    ("balance_sheet", "liabilitas_jangka_panjang", "liab_jangka_panjang_rows", "total_liab_jangka_panjang"),
+    ("balance_sheet", "total_liabilitas", None, "total_liabilitas"),
+    ("balance_sheet", "total_pasiva", None, "total_pasiva"),
+]
+
+
+def export_financial_statements(session, start: date, end: date):
+    reports = get_reports(session, None, "income_statement", "capital_statement", "balance_sheet", start=start, end=end)
+
+    rows = []
+    totals = {}
+    for statement, section, rows_key, total_key in STATEMENT_SECTIONS:
+        data = reports[statement]
+        if rows_key:
+            for name, balance in data[rows_key]:
+                rows.append({"statement": statement, "section": section, "account": name, "amount": money(balance)})
+        rows.append({"statement": statement, "section": section, "account": "", "amount": money(data[total_key])})
+        totals[total_key] = money(data[total_key])
+
+    return {
+        "columns": ["statement", "section", "account", "amount"],
+        "rows": rows,
+        "totals": totals,
+    }
+
+
+EXPORTERS = {
+    "trial_balance": export_trial_balance,
+    "adjusted_trial_balance": export_adjusted_trial_balance,
+    "ledger": export_ledger,
+    "financial_statements": export_financial_statements,
+}
+
+
+def get_company(session, company_id: int = None):
+    q = session.query(Company)
+    if company_id is not None:
+        company = q.filter(Company.id == company_id).first()
+        if company is None:
+            raise ValueError(f"Perusahaan dengan id {company_id} tidak ditemukan.")
+        return company
+    return q.order_by(Company.id).first()
+
+
+def period_label(start: date, end: date) -> str:
+    """Label periode untuk nama file: "2025" untuk tahun penuh, selain itu "awal_akhir"."""
+    year = full_year(start, end)
+    return str(year) if year else f"{start.isoformat()}_{end.isoformat()}"
+
+
+def build_export(session, report: str, start: date, end: date, company_id: int = None) -> dict:
+    """Data satu laporan untuk rentang tanggal beserta metadata perusahaan, siap ditulis ke CSV/JSON."""
+    company = get_company(session, company_id)
+    data = EXPORTERS[report](session, start, end)
+    return {
+        "report": report,
+        "year": full_year(start, end),
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "company": company.name if company else None,
+        "currency": company.currency if company else "IDR",
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        **data,
+    }
+
+
+def write_csv(export: dict, f):
+    """Baris laporan ke CSV; total yang punya kolom sendiri jadi baris TOTAL."""
+    writer = csv.DictWriter(f, fieldnames=export["columns"])
+    writer.writeheader()
+    writer.writerows(export["rows"])
+
+    total_row = {k: v for k, v in export["totals"].items() if k in export["columns"]}
+    if total_row:
+        total_row[export["columns"][0]] = "TOTAL"
+        writer.writerow(total_row)
+
+
+def write_json(export: dict, f):
+    json.dump(export, f, ensure_ascii=False, indent=2)
+    f.write("\n")
+
+
+WRITERS = {"csv": write_csv, "json": write_json}
+
+
+# ============================================================
+# EKSPOR BARIS JURNAL (STREAMING)
+# ============================================================
+
+JOURNAL_LINE_COLUMNS = [
+    "date",
+    "number",
+    "description",
+    "is_adjustment",
+    "account_code",
+    "account_name",
+    "debit",
+    "credit",
+    "entry_id",
+    "line_id",
+]
+
+# baris per batch yang diambil dari cursor database
+STREAM_BATCH_SIZE = 20000
+
+
+def year_range(year: int):
+    return date(year, 1, 1), date(year, 12, 31)
+
+
+def iter_journal_lines(session, start: date, end: date, batch_size: int = STREAM_BATCH_SIZE):
+    """
+    Baris jurnal (digabung dengan entry dan akun) dalam rentang tanggal,
+    per batch berisi tuple (date, number, description, is_adjustment, code,
+    name, is_debit, amount, entry_id, line_id). Dibaca dengan yield_per
+    (stream_results: cursor server di MySQL/PostgreSQL), jadi memori tetap
+    berapa pun jumlah barisnya.
+    """
+    q = (
+        session.query(
+            JournalEntry.date,
+            JournalEntry.number,
+            JournalEntry.description,
+            JournalEntry.is_adjustment,
+            Account.code,
+            Account.name,
+            JournalLine.is_debit,
+            JournalLine.amount,
+            JournalEntry.id,
+            JournalLine.id,
+        )
+        .select_from(JournalLine)
+        .join(JournalEntry, JournalLine.entry_id == JournalEntry.id)
+        .join(Account, JournalLine.account_id == Account.id)
+        .filter(JournalEntry.date >= start, JournalEntry.date <= end)
+        .order_by(JournalEntry.date, JournalEntry.id, JournalLine.id)
+        .yield_per(batch_size)
+    )
+
+    rows = iter(q)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_journal_lines_csv(batches, f) -> int:
+    writer = csv.writer(f)
+    writer.writerow(JOURNAL_LINE_COLUMNS)
+
+    count = 0
+    for batch in batches:
+        writer.writerows(
+            (
+                d.isoformat(),
+                number,
+                description,
+                int(bool(is_adjustment)),
+                code,
+                name,
+                f"{amount:.2f}" if is_debit else "0.00",
+                "0.00" if is_debit else f"{amount:.2f}",
+                entry_id,
+                line_id,
+            )
+            for d, number, description, is_adjustment, code, name, is_debit, amount, entry_id, line_id in batch
+        )
+        count += len(batch)
+    return count
+
+
+def write_journal_lines_parquet(batches, f) -> int:
+    """Satu row group per batch; hanya satu batch yang ada di memori."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Ekspor Parquet membutuhkan paket pyarrow.") from None
+
+    money_type = pa.decimal128(18, 2)
+    schema = pa.schema(
+        [
+            ("date", pa.date32()),
+            ("number", pa.string()),
+            ("description", pa.string()),
+            ("is_adjustment", pa.bool_()),
+            ("account_code", pa.string()),
+            ("account_name", pa.string()),
+            ("debit", money_type),
+            ("credit", money_type),
+            ("entry_id", pa.int64()),
+            ("line_id", pa.int64()),
+        ]
+    )
+    zero = cents_to_decimal(0)
+
+    count = 0
+    with pq.ParquetWriter(f, schema) as writer:
+        for batch in batches:
+            d, number, description, is_adjustment, code, name, is_debit, amount, entry_id, line_id = zip(*batch)
+            debit = [a if side else zero for side, a in zip(is_debit, amount)]
+            credit = [zero if side else a for side, a in zip(is_debit, amount)]
+            columns = [d, number, description, [bool(v) for v in is_adjustment], code, name, debit, credit, entry_id, line_id]
+            writer.write_table(pa.Table.from_arrays([pa.array(c, type=t) for c, t in zip(columns, schema.types)], schema=schema))
+            count += len(batch)
+    return count
+
+
+# format -> (penulis, mode open file, mime)
+JOURNAL_LINE_FORMATS = {
+    "csv": (write_journal_lines_csv, "w", "text/csv"),
+    "parquet": (write_journal_lines_parquet, "wb", "application/vnd.apache.parquet"),
+}
+
+
+def write_journal_lines(session, fmt: str, f, start: date, end: date, batch_size: int = STREAM_BATCH_SIZE) -> int:
+    """Tulis baris jurnal rentang tanggal ke file terbuka (mode sesuai format). Hasil: jumlah baris."""
+    writer = JOURNAL_LINE_FORMATS[fmt][0]
+    return writer(iter_journal_lines(session, start, end, batch_size), f)
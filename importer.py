@@ -0,0 +1,353 @@
+"""
+Import jurnal massal dari CSV/XLSX (misalnya migrasi dari POS), tanpa Streamlit.
+
+Satu baris file = satu baris jurnal, dengan kolom:
+    date, number, description, account_code, debit, credit
+Baris dengan tanggal dan nomor yang sama membentuk satu jurnal; keterangan
+jurnal diambil dari baris pertamanya. Tanggal YYYY-MM-DD atau DD-MM-YYYY,
+jumlah berupa desimal rupiah tanpa pemisah ribuan ("1500000" / "1500000.50"),
+sama seperti hasil export.py.
+
+Validasi dilakukan per kolom dan per grup jurnal (pandas), penyimpanan
+memakai executemany per potongan jurnal, satu transaksi per potongan.
+"""
+from datetime import date
+
+from sqlalchemy import func, insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from accounting import (
+    cents_to_decimal,
+    delete_report_snapshots,
+    delete_year_end_balances,
+    format_cents_array,
+    get_report_cache,
+    post_daily_deltas,
+    post_monthly_delta,
+    refresh_report_snapshots,
+)
+from models import Account, ClosingStatus, JournalEntry, JournalLine
+
+IMPORT_COLUMNS = ("date", "number", "description", "account_code", "debit", "credit")
+
+# jumlah jurnal per transaksi
+IMPORT_CHUNK_SIZE = 1000
+
+# batas jumlah parameter IN (...) per query
+_IN_BATCH = 1000
+
+# rupiah tanpa pemisah ribuan, paling banyak dua desimal
+_AMOUNT_PATTERN = r"^(\d+)(?:\.(\d{1,2}))?$"
+
+
+def read_journal_file(source, filename: str = None):
+    """
+    Baca CSV/XLSX (path atau file upload) menjadi DataFrame teks dengan
+    kolom IMPORT_COLUMNS. Index = nomor baris di file (header = baris 1).
+    """
+    import pandas as pd
+
+    name = (filename or str(source)).lower()
+    if name.endswith((".xlsx", ".xlsm")):
+        # butuh paket openpyxl
+        df = pd.read_excel(source, dtype=str)
+    else:
+        df = pd.read_csv(source, dtype=str, keep_default_na=False)
+
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    missing = [c for c in IMPORT_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ada: {', '.join(missing)}")
+
+    df = df[list(IMPORT_COLUMNS)].fillna("")
+    for column in IMPORT_COLUMNS:
+        df[column] = df[column].astype(str).str.strip()
+    df.index = pd.RangeIndex(2, len(df) + 2, name="row")
+    return df
+
+
+def get_account_code_map(session) -> dict:
+    """Kode akun aktif -> id, lewat cache laporan (dibuang saat akun berubah)."""
+    return get_report_cache().get(
+        "account_codes",
+        None,
+        lambda: dict(session.query(Account.code, Account.id).filter(Account.is_active == True)),  # noqa: E712
+    )
+
+
+def _parse_dates(text):
+    import pandas as pd
+
+    dates = pd.to_datetime(text, format="ISO8601", errors="coerce")
+    return dates.fillna(pd.to_datetime(text, format="%d-%m-%Y", errors="coerce"))
+
+
+def _parse_cents(text):
+    """Kolom teks rupiah -> Int64 sen (kosong = 0, format salah = <NA>)."""
+    import pandas as pd
+
+    parts = text.where(text != "", "0").str.extract(_AMOUNT_PATTERN)
+    whole = pd.to_numeric(parts[0]).astype("Int64")
+    fraction = pd.to_numeric(parts[1].fillna("").str.ljust(2, "0")).astype("Int64")
+    return whole * 100 + fraction
+
+
+def _existing_entries(session, numbers, is_adjustment: bool) -> set:
+    """(tanggal, nomor) jurnal yang sudah ada di database untuk nomor-nomor ini."""
+    found = set()
+    for start in range(0, len(numbers), _IN_BATCH):
+        q = session.query(JournalEntry.date, JournalEntry.number).filter(
+            JournalEntry.number.in_(numbers[start:start + _IN_BATCH]),
+            JournalEntry.is_adjustment == bool(is_adjustment),
+        )
+        found.update((d, n) for d, n in q)
+    return found
+
+
+def validate_journal_rows(session, rows, is_adjustment: bool = False):
+    """
+    Validasi baris hasil read_journal_file() tanpa loop per baris.
+    Hasil: (baris valid, baris ditolak). Baris valid berkolom entry, date,
+    year, month, number, description, account_id, is_debit, cents; baris
+    ditolak adalah baris asli ditambah kolom reason. Satu baris ditolak
+    membuat seluruh jurnalnya ditolak.
+    """
+    import pandas as pd
+
+    reason = pd.Series("", index=rows.index, dtype=object)
+
+    def reject(mask, text):
+        nonlocal reason
+        reason = reason.mask(mask & (reason == ""), text)
+
+    dates = _parse_dates(rows["date"])
+    reject(dates.isna(), "tanggal tidak valid")
+    reject(rows["number"] == "", "nomor kosong")
+
+    account_id = rows["account_code"].map(get_account_code_map(session))
+    reject(account_id.isna(), "kode akun tidak dikenal atau nonaktif")
+
+    debit = _parse_cents(rows["debit"])
+    credit = _parse_cents(rows["credit"])
+    reject(debit.isna() | credit.isna(), "jumlah tidak valid")
+    debit = debit.fillna(0)
+    credit = credit.fillna(0)
+    reject((debit > 0) & (credit > 0), "debit dan kredit terisi bersamaan")
+    reject((debit == 0) & (credit == 0), "jumlah nol")
+
+    # aturan tutup buku, sama seperti form jurnal
+    years = dates.dt.year
+    closed_years = {
+        year
+        for (year,) in session.query(ClosingStatus.year).filter(
+            ClosingStatus.year.in_([int(y) for y in years.dropna().unique()]),
+            ClosingStatus.is_closed == True,  # noqa: E712
+        )
+    }
+    in_closed = years.isin(closed_years)
+    year_text = "tahun " + years.astype("Int64").astype(str)
+    if is_adjustment:
+        reject(dates.notna() & ~in_closed, year_text + " belum proses penyesuaian")
+    else:
+        reject(in_closed, year_text + " sudah proses penyesuaian")
+
+    # satu jurnal = tanggal + nomor yang sama
+    entry_date = dates.dt.date
+    entry = rows.groupby([entry_date, rows["number"]], sort=False, dropna=False).ngroup()
+    description = rows["description"].groupby(entry).transform("first")
+    reject(description == "", "keterangan kosong")
+
+    existing = _existing_entries(session, rows["number"].unique().tolist(), is_adjustment)
+    if existing:
+        keys = pd.Series(list(zip(entry_date, rows["number"])), index=rows.index)
+        reject(keys.isin(existing), "nomor sudah ada di database pada tanggal yang sama")
+
+    reject((reason != "").groupby(entry).transform("any"), "baris lain pada jurnal ini ditolak")
+
+    # balance per jurnal yang semua barisnya lolos
+    row_ok = reason == ""
+    totals = pd.DataFrame({"debit": debit[row_ok], "credit": credit[row_ok]}).groupby(entry[row_ok]).sum()
+    unbalanced = totals[totals["debit"] != totals["credit"]]
+    if len(unbalanced):
+        text = pd.Series(
+            "jurnal tidak balance (D "
+            + format_cents_array(unbalanced["debit"])
+            + " / K "
+            + format_cents_array(unbalanced["credit"])
+            + ")",
+            index=unbalanced.index,
+        )
+        reject(entry.map(text).notna(), entry.map(text))
+
+    ok = reason == ""
+    valid = pd.DataFrame(
+        {
+            "entry": entry,
+            "date": entry_date,
+            "year": years,
+            "month": dates.dt.month,
+            "number": rows["number"],
+            "description": description,
+            "account_id": account_id,
+            "is_debit": debit > 0,
+            "cents": debit.where(debit > 0, credit),
+        }
+    )[ok]
+    valid = valid.astype({"year": "int64", "month": "int64", "account_id": "int64", "cents": "int64"})
+    # nomor jurnal berurutan 0..n-1 untuk pemotongan per transaksi
+    valid["entry"] = valid.groupby("entry", sort=False).ngroup()
+
+    return valid, rows[~ok].assign(reason=reason[~ok])
+
+
+def _insert_chunk(session, chunk, is_adjustment: bool, created_by_id):
+    entries = chunk.drop_duplicates("entry")
+    last_id = session.query(func.max(JournalEntry.id)).scalar() or 0
+    session.execute(
+        insert(JournalEntry),
+        [
+            {
+                "date": d,
+                "number": number,
+                "description": description,
+                "is_adjustment": bool(is_adjustment),
+                "created_by_id": created_by_id,
+            }
+            for d, number, description in zip(entries["date"], entries["number"], entries["description"])
+        ],
+    )
+
+    # MySQL tidak mendukung RETURNING: id dibaca ulang lewat (tanggal, nomor),
+    # hanya dari baris sesudah id terakhir sebelum insert. Tidak ada unique
+    # constraint, jadi jurnal sama yang diinput bersamaan lewat form membuat
+    # key ganda: potongan ini digagalkan, bukan baris ditempel ke jurnal lain.
+    ids = {}
+    numbers = entries["number"].unique().tolist()
+    for start in range(0, len(numbers), _IN_BATCH):
+        q = session.query(JournalEntry.id, JournalEntry.date, JournalEntry.number).filter(
+            JournalEntry.id > last_id,
+            JournalEntry.number.in_(numbers[start:start + _IN_BATCH]),
+            JournalEntry.date >= entries["date"].min(),
+            JournalEntry.date <= entries["date"].max(),
+            JournalEntry.is_adjustment == bool(is_adjustment),
+        )
+        for entry_id, d, number in q:
+            if (d, number) in ids:
+                raise ValueError(f"nomor {number} tanggal {d} disimpan bersamaan dari tempat lain")
+            ids[(d, number)] = entry_id
+
+    session.execute(
+        insert(JournalLine),
+        [
+            {
+                "entry_id": ids[(d, number)],
+                "account_id": account_id,
+                "is_debit": is_debit,
+                "amount": cents_to_decimal(cents),
+            }
+            for d, number, account_id, is_debit, cents in zip(
+                chunk["date"],
+                chunk["number"],
+                chunk["account_id"].tolist(),
+                chunk["is_debit"].tolist(),
+                chunk["cents"].tolist(),
+            )
+        ],
+    )
+
+    # total per (tanggal, akun): indeks saldo harian sekali per potongan,
+    # ringkasan saldo bulanan satu delta per (bulan, akun)
+    sides = chunk.assign(
+        debit=chunk["cents"].where(chunk["is_debit"], 0),
+        credit=chunk["cents"].where(~chunk["is_debit"], 0),
+    )
+    daily = sides.groupby(["date", "account_id"])[["debit", "credit"]].sum()
+    post_daily_deltas(
+        session,
+        is_adjustment,
+        {
+            (int(account_id), d): (cents_to_decimal(int(debit)), cents_to_decimal(int(credit)))
+            for (d, account_id), debit, credit in zip(daily.index, daily["debit"], daily["credit"])
+        },
+    )
+    monthly = sides.groupby(["year", "month", "account_id"])[["debit", "credit"]].sum()
+    for (year, month), month_totals in monthly.groupby(level=["year", "month"]):
+        post_monthly_delta(
+            session,
+            date(int(year), int(month), 1),
+            is_adjustment,
+            {
+                int(account_id): (cents_to_decimal(int(debit)), cents_to_decimal(int(credit)))
+                for (_, _, account_id), debit, credit in zip(
+                    month_totals.index, month_totals["debit"], month_totals["credit"]
+                )
+            },
+        )
+
+    # snapshot tahun yang sudah ditutup dibangun ulang setelah semua potongan;
+    # sampai saat itu neraca dihitung dari riwayat, tanpa saldo akhir tahun lama
+    for year in chunk["year"].unique().tolist():
+        delete_report_snapshots(session, year)
+    delete_year_end_balances(session, int(chunk["year"].min()))
+
+    return len(entries), len(chunk)
+
+
+def import_journal_rows(
+    session,
+    rows,
+    is_adjustment: bool = False,
+    created_by_id: int = None,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    dry_run: bool = False,
+):
+    """
+    Validasi lalu simpan baris jurnal. Tiap chunk_size jurnal disimpan dan
+    di-commit dalam satu transaksi; potongan yang gagal di-rollback dan
+    barisnya ikut ditolak. dry_run hanya memvalidasi.
+    Hasil: {"entries", "lines", "rejected": DataFrame baris ditolak + reason}
+    """
+    import pandas as pd
+
+    valid, rejected = validate_journal_rows(session, rows, is_adjustment)
+    session.rollback()
+
+    if dry_run:
+        return {"entries": valid["entry"].nunique(), "lines": len(valid), "rejected": rejected}
+
+    entries = lines = 0
+    failed = [rejected]
+    years = set()
+    for _, chunk in valid.groupby(valid["entry"] // chunk_size):
+        # jurnal yang sama bisa sudah diinput lewat form sejak validasi
+        existing = _existing_entries(session, chunk["number"].unique().tolist(), is_adjustment)
+        if existing:
+            duplicate = pd.Series(list(zip(chunk["date"], chunk["number"])), index=chunk.index).isin(existing)
+            failed.append(
+                rows.loc[chunk.index[duplicate]].assign(reason="nomor sudah ada di database pada tanggal yang sama")
+            )
+            chunk = chunk[~duplicate]
+            if chunk.empty:
+                continue
+        try:
+            chunk_entries, chunk_lines = _insert_chunk(session, chunk, is_adjustment, created_by_id)
+            session.commit()
+        except (SQLAlchemyError, ValueError) as e:
+            session.rollback()
+            error = getattr(e, "orig", None) or e
+            failed.append(rows.loc[chunk.index].assign(reason=f"gagal disimpan: {error}"))
+            continue
+        entries += chunk_entries
+        lines += chunk_lines
+        years.update(chunk["year"].unique().tolist())
+
+    if years:
+        refresh_report_snapshots(session, *years)
+        session.commit()
+
+    return {"entries": entries, "lines": lines, "rejected": pd.concat(failed).sort_index()}
+
+
+def write_rejected(rejected, f):
+    """Baris yang ditolak ke CSV (nomor baris file + kolom asli + alasan)."""
+    rejected.to_csv(f, index_label="row")
@@ -0,0 +1,755 @@
+"""
+Perintah administrasi aplikasi akuntansi dari command line.
+
+Contoh:
+    python manage.py rebuild-balances --year 2025
+    python manage.py verify-balances
+    python manage.py rebuild-snapshots
+    python manage.py migrate --year 2025
+    python manage.py bench-login --concurrency 20
+    python manage.py report all --year 2025 --format csv --output laporan/
+    python manage.py report trial-balance --year 2025 --format json
+    python manage.py report financial-statements --start 2025-04-01 --end 2025-06-30
+    python manage.py report financial-statements --as-of 2025-08-15
+    python manage.py startup-time --repeat 5 --budget-ms 800
+    python manage.py bench --entries 1000,10000,100000 --fixture --output bench.json
+    python manage.py bench --entries 10000 --compare bench.json
+    python manage.py import-journal pos_januari.csv --rejects ditolak.csv
+    python manage.py export-journal --year 2025 --format parquet --output jurnal_2025.parquet
+    python manage.py export-journal --start 2025-01-01 --end 2025-03-31 > jurnal_q1.csv
+
+DATABASE_URL dibaca dari --database-url, variabel environment DATABASE_URL,
+atau .streamlit/secrets.toml (sama seperti app.py).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+from sqlalchemy import inspect
+
+import accounting
+import auth
+import bench
+import db
+import export
+import importer
+import models
+
+
+def ensure_app_tables():
+    models.Base.metadata.create_all(db.get_engine(), tables=models.APP_TABLES)
+
+
+def ensure_journal_version():
+    """Tambah kolom version (optimistic locking edit jurnal) ke tabel Django yang sudah ada."""
+    engine = db.get_engine()
+    columns = {column["name"] for column in inspect(engine).get_columns(models.JournalEntry.__tablename__)}
+    if "version" in columns:
+        return False
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            f"ALTER TABLE {models.JournalEntry.__tablename__} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+        )
+    return True
+
+
+def drop_redundant_indexes():
+    """
+    Hapus index satu kolom accounting_accountmonthlybalance.year dari versi
+    lama; sudah tercakup awalan index penutup di REPORT_INDEXES.
+    Hasil: daftar index yang dihapus
+    """
+    engine = db.get_engine()
+    table = models.AccountMonthlyBalance.__tablename__
+    names = {index["name"] for index in inspect(engine).get_indexes(table)}
+    dropped = []
+    for name in ("ix_accounting_accountmonthlybalance_year",):
+        if name not in names:
+            continue
+        on_table = f" ON {table}" if engine.dialect.name == "mysql" else ""
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"DROP INDEX {name}{on_table}")
+        dropped.append(name)
+    return dropped
+
+
+def cmd_rebuild_balances(args):
+    ensure_app_tables()
+
+    with db.get_session() as session:
+        count = accounting.rebuild_account_balances(session, args.year)
+        daily = accounting.rebuild_daily_balances(session, args.year)
+        # saldo akhir tahun dan snapshot dihitung dari ringkasan saldo
+        accounting.delete_year_end_balances(session, args.year)
+        years = accounting.refresh_report_snapshots(session, *accounting.get_closed_years(session, args.year))
+        session.commit()
+
+    scope = f"tahun {args.year}" if args.year else "semua tahun"
+    print(f"Ringkasan saldo bulanan ({scope}) dibangun ulang: {count} baris.")
+    print(f"Indeks saldo harian ({scope}) dibangun ulang: {daily} baris.")
+    print(f"Saldo akhir tahun dan snapshot dibangun ulang untuk tahun: {', '.join(map(str, years)) or '-'}")
+    return 0
+
+
+def cmd_verify_balances(args):
+    with db.get_session() as session:
+        mismatches = accounting.verify_account_balances(session, args.year)
+        daily_mismatches = accounting.verify_daily_balances(session, args.year)
+
+    if mismatches:
+        print(f"Ditemukan {len(mismatches)} selisih ringkasan saldo bulanan:")
+        for (account_id, year, month, is_adj), expected, stored in mismatches:
+            journal = "penyesuaian" if is_adj else "umum"
+            print(
+                f"  akun {account_id} {year}-{month:02d} ({journal}): "
+                f"jurnal D {expected[0]} K {expected[1]} / ringkasan D {stored[0]} K {stored[1]}"
+            )
+    else:
+        print("Ringkasan saldo bulanan cocok dengan jurnal.")
+
+    if daily_mismatches:
+        print(f"Ditemukan {len(daily_mismatches)} selisih indeks saldo harian (kumulatif sejak 1 Januari):")
+        for (account_id, day, is_adj), expected, stored in daily_mismatches:
+            journal = "penyesuaian" if is_adj else "umum"
+            expected = f"D {expected[0]} K {expected[1]}" if expected else "tidak ada"
+            stored = f"D {stored[0]} K {stored[1]}" if stored else "tidak ada"
+            print(f"  akun {account_id} {day} ({journal}): jurnal {expected} / indeks {stored}")
+    else:
+        print("Indeks saldo harian cocok dengan jurnal.")
+
+    return 1 if mismatches or daily_mismatches else 0
+
+
+def cmd_rebuild_snapshots(args):
+    ensure_app_tables()
+
+    with db.get_session() as session:
+        accounting.delete_report_snapshots(session, args.year)
+        accounting.delete_year_end_balances(session, args.year)
+        # saldo akhir tahun sesudah args.year bergantung padanya: ikut dibangun ulang
+        years = accounting.refresh_report_snapshots(session, *accounting.get_closed_years(session, args.year))
+        session.commit()
+
+    print(f"Saldo akhir tahun dan snapshot laporan dibangun ulang untuk tahun: {', '.join(map(str, years)) or '-'}")
+    return 0
+
+
+# Awalan EXPLAIN per dialect database
+EXPLAIN_PREFIX = {
+    "mysql": "EXPLAIN ",
+    "mariadb": "EXPLAIN ",
+    "postgresql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+
+def capture_report_queries(year):
+    """
+    Jalankan fungsi laporan dan jurnal untuk satu tahun, kumpulkan
+    statement SELECT yang benar-benar dikirim ke database.
+    """
+    from sqlalchemy import event
+
+    statements = {}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and statement not in statements:
+            statements[statement] = parameters
+
+    event.listen(db.get_engine(), "before_cursor_execute", before_cursor_execute)
+    try:
+        with db.get_session() as session:
+            accounting.compute_reports(session, year)
+            accounting.get_ledger_data(session, year)
+            accounting._raw_monthly_totals(session, year)
+            for is_adjustment in (False, True):
+                conditions = accounting.journal_filter_conditions(
+                    is_adjustment, date(year, 1, 1), date(year, 12, 31)
+                )
+                accounting.fetch_journal_page(session, conditions)
+                accounting.get_journal_totals(session, conditions)
+    finally:
+        event.remove(db.get_engine(), "before_cursor_execute", before_cursor_execute)
+
+    return list(statements.items())
+
+
+def is_full_scan(dialect, row):
+    if dialect in ("mysql", "mariadb"):
+        return row.get("type") == "ALL"
+    text = " ".join(str(v) for v in row.values())
+    if dialect == "postgresql":
+        return "Seq Scan" in text
+    if dialect == "sqlite":
+        detail = str(row.get("detail", ""))
+        return detail.startswith("SCAN ") and "INDEX" not in detail and "subquery" not in detail
+    return False
+
+
+def explain_queries(statements, title):
+    dialect = db.get_engine().dialect.name
+    prefix = EXPLAIN_PREFIX.get(dialect, "EXPLAIN ")
+
+    print(f"=== EXPLAIN {title} ({dialect}) ===")
+    full_scans = 0
+    with db.get_engine().connect() as conn:
+        for no, (statement, parameters) in enumerate(statements, start=1):
+            print(f"-- [{no}] {' '.join(statement.split())[:150]}")
+            result = conn.exec_driver_sql(prefix + statement, parameters)
+            for row in result.mappings():
+                row = dict(row)
+                if is_full_scan(dialect, row):
+                    full_scans += 1
+                    marker = "  !! "
+                else:
+                    marker = "     "
+                print(marker + " | ".join(f"{k}={v}" for k, v in row.items() if v is not None))
+    print(f"=== {full_scans} full table scan ===")
+    print()
+    return full_scans
+
+
+def cmd_migrate(args):
+    year = args.year or date.today().year
+
+    ensure_app_tables()
+    if ensure_journal_version():
+        print("Kolom version ditambahkan ke accounting_journalentry.")
+
+    # indeks saldo harian baru: isi sekali dari jurnal yang sudah ada
+    with db.get_session() as session:
+        if session.query(models.AccountDailyBalance.id).first() is None:
+            count = accounting.rebuild_daily_balances(session)
+            session.commit()
+            print(f"Indeks saldo harian dibangun: {count} baris.")
+
+    # snapshot tahun yang sudah ditutup: lengkapi yang belum ada / versi lama
+    with db.get_session() as session:
+        stale = accounting.get_stale_snapshot_years(session)
+        if stale:
+            years = accounting.refresh_report_snapshots(session, *stale)
+            session.commit()
+            print(f"Snapshot laporan dibangun ulang untuk tahun: {', '.join(map(str, years))}")
+
+    statements = capture_report_queries(year) if args.explain else []
+    if statements:
+        explain_queries(statements, "sebelum migrasi")
+
+    for index in models.REPORT_INDEXES:
+        index.create(db.get_engine(), checkfirst=True)
+        print(f"Index {index.name} pada {index.table.name}: ok")
+    for name in drop_redundant_indexes():
+        print(f"Index {name} dihapus (tercakup index penutup).")
+    print()
+
+    if statements:
+        explain_queries(statements, "sesudah migrasi")
+    return 0
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def cmd_bench_login(args):
+    """
+    Ukur latensi login saat N user login bersamaan. Tanpa --email, hanya
+    verifikasi password (hash Django dibuat di sini) yang diukur.
+    """
+    hasher = auth.PasswordHasher(workers=args.workers, max_pending=args.max_pending, wait=args.wait)
+
+    if args.email:
+        # lewat authenticate_email supaya query user ikut terukur
+        auth.get_password_hasher = lambda: hasher
+
+        def login():
+            return auth.authenticate_email(args.email, args.password) is not None
+    else:
+        encoded = auth.make_django_password(args.password, iterations=args.iterations)
+
+        def login():
+            return hasher.verify(args.password, encoded)
+
+    latencies = []
+    busy = []
+    failed = []
+    lock = threading.Lock()
+    start = threading.Barrier(args.concurrency)
+
+    def client():
+        start.wait()
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            try:
+                ok = login()
+            except auth.LoginBusy:
+                with lock:
+                    busy.append(time.perf_counter() - t0)
+                continue
+            with lock:
+                (latencies if ok else failed).append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=client) for _ in range(args.concurrency)]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - t0
+    hasher.executor.shutdown()
+
+    total = args.concurrency * args.rounds
+    print(
+        f"{args.concurrency} login bersamaan x {args.rounds} putaran, "
+        f"{args.workers} worker, maks {args.max_pending} job"
+    )
+    print(f"  berhasil : {len(latencies)}/{total}")
+    print(f"  sibuk    : {len(busy)} (ditolak setelah {args.wait:.2f} dtk)")
+    if failed:
+        print(f"  gagal    : {len(failed)} (password salah?)")
+    if latencies:
+        print(f"  p50      : {percentile(latencies, 50) * 1000:.0f} ms")
+        print(f"  p99      : {percentile(latencies, 99) * 1000:.0f} ms")
+        print(f"  maks     : {max(latencies) * 1000:.0f} ms")
+    print(f"  durasi   : {elapsed:.2f} dtk ({len(latencies) / elapsed:.1f} login/dtk)")
+    return 0
+
+
+def cmd_report(args):
+    names = export.EXPORT_REPORTS if args.report == "all" else [args.report.replace("-", "_")]
+    if args.year and (args.start or args.end or args.as_of):
+        print("--year tidak bisa digabung dengan --start/--end/--as-of.", file=sys.stderr)
+        return 2
+    try:
+        start, end = accounting.report_period(
+            args.year or (None if args.start or args.end or args.as_of else db.current_year()),
+            args.start,
+            args.end,
+            args.as_of,
+        )
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    period = export.period_label(start, end)
+
+    if args.report == "all":
+        if not args.output:
+            print("report all membutuhkan --output berupa folder.", file=sys.stderr)
+            return 2
+        os.makedirs(args.output, exist_ok=True)
+
+    with db.get_session() as session:
+        for name in names:
+            try:
+                data = export.build_export(session, name, start, end, args.company)
+            except ValueError as e:
+                print(e, file=sys.stderr)
+                return 1
+
+            if args.report == "all":
+                path = os.path.join(args.output, f"{name}_{period}.{args.format}")
+            else:
+                path = args.output
+
+            if path:
+                with open(path, "w", newline="", encoding="utf-8") as f:
+                    export.WRITERS[args.format](data, f)
+                print(f"{name} {period}: {len(data['rows'])} baris -> {path}", file=sys.stderr)
+            else:
+                export.WRITERS[args.format](data, sys.stdout)
+    return 0
+
+
+def cmd_export_journal(args):
+    """
+    Ekspor semua baris jurnal satu tahun atau rentang tanggal ke CSV/Parquet,
+    dibaca per batch dari cursor database (memori tetap).
+    """
+    if args.start or args.end:
+        if not (args.start and args.end):
+            print("--start dan --end harus diisi bersamaan.", file=sys.stderr)
+            return 2
+        start, end = args.start, args.end
+    else:
+        start, end = export.year_range(args.year or db.current_year())
+
+    mode = export.JOURNAL_LINE_FORMATS[args.format][1]
+    if not args.output and mode == "wb":
+        print(f"Format {args.format} membutuhkan --output.", file=sys.stderr)
+        return 2
+
+    t0 = time.perf_counter()
+    with db.get_session() as session:
+        if args.output:
+            options = {"newline": "", "encoding": "utf-8"} if mode == "w" else {}
+            with open(args.output, mode, **options) as f:
+                count = export.write_journal_lines(session, args.format, f, start, end, args.batch_size)
+        else:
+            count = export.write_journal_lines(session, args.format, sys.stdout, start, end, args.batch_size)
+
+    print(
+        f"{count} baris jurnal {start} s/d {end} -> {args.output or 'stdout'} ({time.perf_counter() - t0:.1f} dtk)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def cmd_import_journal(args):
+    """
+    Import jurnal massal dari CSV/XLSX. Baris yang ditolak (beserta
+    alasannya) ditulis ke --rejects; status keluar 1 jika ada yang ditolak.
+    """
+    try:
+        rows = importer.read_journal_file(args.file)
+    except (ValueError, ImportError) as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    t0 = time.perf_counter()
+    with db.get_session() as session:
+        result = importer.import_journal_rows(
+            session,
+            rows,
+            is_adjustment=args.adjustment,
+            chunk_size=args.chunk_size,
+            dry_run=args.dry_run,
+        )
+    elapsed = time.perf_counter() - t0
+
+    rejected = result["rejected"]
+    action = "Lolos validasi" if args.dry_run else "Diimpor"
+    print(f"{action}: {result['entries']} jurnal, {result['lines']} baris ({elapsed:.1f} dtk)")
+    print(f"Ditolak: {len(rejected)} baris dari {len(rows)}")
+
+    if len(rejected):
+        if args.rejects:
+            with open(args.rejects, "w", newline="", encoding="utf-8") as f:
+                importer.write_rejected(rejected, f)
+            print(f"Daftar baris ditolak -> {args.rejects}")
+        else:
+            for row, reason in rejected["reason"].head(20).items():
+                print(f"  baris {row}: {reason}", file=sys.stderr)
+            if len(rejected) > 20:
+                print(f"  ... {len(rejected) - 20} lagi (pakai --rejects untuk daftar lengkap)", file=sys.stderr)
+        return 1
+    return 0
+
+
+def parse_accounts(text):
+    """ "asset=8,expense=10" -> {"asset": 8, "expense": 10, ...} (tipe lain default)"""
+    accounts = dict(bench.BENCH_ACCOUNTS)
+    for item in filter(None, text.split(",")):
+        account_type, _, count = item.partition("=")
+        if account_type not in accounts:
+            raise argparse.ArgumentTypeError(f"tipe akun tidak dikenal: {account_type}")
+        accounts[account_type] = int(count)
+    return accounts
+
+
+def cmd_bench(args):
+    """
+    Ukur fungsi laporan pada buku besar sintetis untuk tiap --entries (dan
+    data accounting_db.sql dengan --fixture). Database benchmark dikosongkan,
+    jadi hanya --db yang dipakai, tidak pernah DATABASE_URL aplikasi.
+    """
+    if args.db:
+        url = args.db
+    else:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-'), 'bench.db')}"
+    os.environ["DATABASE_URL"] = url
+
+    functions = args.functions.split(",") if args.functions else list(bench.BENCH_FUNCTIONS)
+    unknown = [f for f in functions if f not in bench.BENCH_FUNCTIONS]
+    if unknown:
+        print(f"Fungsi tidak dikenal: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    config = {
+        "accounts": args.accounts,
+        "entries_per_year": args.entries,
+        "lines_per_entry": args.lines_per_entry,
+        "adjustment_ratio": args.adjustment_ratio,
+        "years": args.years,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "fixture": args.fixture,
+    }
+
+    datasets = [("fixture", None)] if args.fixture else []
+    datasets += [(str(entries), entries) for entries in args.entries]
+
+    results = {"meta": bench.bench_metadata(config), "datasets": [], "results": []}
+    for name, entries in datasets:
+        bench.reset_database()
+        t0 = time.perf_counter()
+        with db.get_session() as session:
+            if entries is None:
+                dataset = bench.load_fixture(session)
+            else:
+                dataset = bench.generate_ledger(
+                    session,
+                    args.accounts,
+                    entries,
+                    args.lines_per_entry,
+                    args.adjustment_ratio,
+                    args.years,
+                    args.seed,
+                )
+        dataset = {"name": name, **dataset, "load_seconds": round(time.perf_counter() - t0, 2)}
+        results["datasets"].append(dataset)
+        print(
+            f"[{name}] {dataset['entries']} jurnal, {dataset['lines']} baris, {dataset['accounts']} akun "
+            f"(dimuat {dataset['load_seconds']} dtk)",
+            file=sys.stderr,
+        )
+
+        for r in bench.run_dataset(name, dataset, functions, args.repeat):
+            results["results"].append(r)
+            print(f"  {r['function']:<30} median {r['median_ms']:>10.2f} ms   min {r['min_ms']:>10.2f} ms")
+
+    if args.output:
+        bench.write_results(results, args.output)
+        print(f"Hasil -> {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        print(f"Dibandingkan dengan {args.compare} (commit {previous['meta'].get('commit') or '-'}):")
+        differs = [k for k in bench.DATASET_CONFIG_KEYS if previous["meta"]["config"].get(k) != config[k]]
+        if differs:
+            print(f"Peringatan: data dibuat dengan {', '.join(differs)} berbeda.", file=sys.stderr)
+        slower = 0
+        for name, function, before, after, ratio in bench.compare_results(previous, results):
+            marker = "  !! " if ratio > args.tolerance else "     "
+            slower += ratio > args.tolerance
+            print(f"{marker}[{name}] {function:<30} {before:>10.2f} -> {after:>10.2f} ms  x{ratio:.2f}")
+        if slower:
+            print(f"{slower} pengukuran lebih lambat dari x{args.tolerance:.2f}.", file=sys.stderr)
+            return 1
+    return 0
+
+
+# modul aplikasi yang diukur waktu import-nya, dari yang paling dasar
+STARTUP_MODULES = ("db", "models", "auth", "accounting", "export", "views", "app")
+# modul berat yang seharusnya baru dimuat saat benar-benar dipakai
+HEAVY_MODULES = ("numpy", "pandas", "pyarrow", "streamlit")
+
+
+def measure_import(module):
+    """
+    Import satu modul di interpreter baru dengan -X importtime.
+    Hasil: (waktu import kumulatif dalam ms, modul berat yang ikut dimuat).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} gagal: {result.stderr.strip().splitlines()[-1]}")
+
+    cumulative_us = None
+    heavy = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.strip() in HEAVY_MODULES:
+            heavy.add(name.strip())
+        # baris modul level atas: tepat satu spasi sebelum nama
+        if name == f" {module}":
+            cumulative_us = int(cumulative)
+    return cumulative_us / 1000, sorted(heavy)
+
+
+def cmd_startup_time(args):
+    """
+    Ukur biaya import (cold start) tiap modul aplikasi, median dari beberapa
+    interpreter baru. Dengan --budget-ms, keluar dengan status 1 jika ada
+    modul yang melebihi anggaran (untuk CI).
+    """
+    modules = args.modules or STARTUP_MODULES
+    # putaran pertama dibuang: kompilasi .pyc ikut terukur
+    for module in modules:
+        measure_import(module)
+
+    results = []
+    for module in modules:
+        runs = [measure_import(module) for _ in range(args.repeat)]
+        results.append(
+            {
+                "module": module,
+                "import_ms": round(statistics.median(ms for ms, _ in runs), 1),
+                "heavy_modules": runs[-1][1],
+            }
+        )
+
+    if args.json:
+        json.dump({"python": sys.version.split()[0], "repeat": args.repeat, "results": results}, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"Waktu import (median {args.repeat}x, interpreter baru):")
+        for r in results:
+            heavy = ", ".join(r["heavy_modules"]) or "-"
+            print(f"  {r['module']:<12} {r['import_ms']:>8.1f} ms   modul berat: {heavy}")
+
+    if args.budget_ms is not None:
+        over = [r for r in results if r["import_ms"] > args.budget_ms]
+        for r in over:
+            print(f"{r['module']}: {r['import_ms']:.1f} ms > anggaran {args.budget_ms:.0f} ms", file=sys.stderr)
+        return 1 if over else 0
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Perintah administrasi aplikasi akuntansi.")
+    parser.add_argument("--database-url", help="URL database SQLAlchemy (default: env DATABASE_URL / secrets)")
+
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser(
+        "rebuild-balances", help="Hitung ulang ringkasan saldo bulanan dan indeks saldo harian dari JournalLine"
+    )
+    p.add_argument("--year", type=int, help="Hanya tahun ini (default: semua tahun)")
+    p.set_defaults(func=cmd_rebuild_balances)
+
+    p = sub.add_parser(
+        "verify-balances", help="Cocokkan ringkasan saldo bulanan dan indeks saldo harian dengan JournalLine"
+    )
+    p.add_argument("--year", type=int, help="Hanya tahun ini (default: semua tahun)")
+    p.set_defaults(func=cmd_verify_balances)
+
+    p = sub.add_parser(
+        "rebuild-snapshots", help="Bangun ulang saldo akhir tahun dan snapshot laporan tahun yang sudah ditutup"
+    )
+    p.add_argument("--year", type=int, help="Mulai tahun ini, tahun sesudahnya ikut (default: semua tahun yang ditutup)")
+    p.set_defaults(func=cmd_rebuild_snapshots)
+
+    p = sub.add_parser(
+        "migrate",
+        help="Buat tabel aplikasi, kolom version jurnal, snapshot yang kurang, dan index laporan; tampilkan EXPLAIN",
+    )
+    p.add_argument("--year", type=int, help="Tahun untuk query contoh EXPLAIN (default: tahun ini)")
+    p.add_argument("--no-explain", dest="explain", action="store_false", help="Lewati EXPLAIN")
+    p.set_defaults(func=cmd_migrate)
+
+    p = sub.add_parser("bench-login", help="Ukur latensi p50/p99 login saat banyak user login bersamaan")
+    p.add_argument("--concurrency", type=int, default=10, help="Jumlah login bersamaan (default: 10)")
+    p.add_argument("--rounds", type=int, default=3, help="Login per user (default: 3)")
+    p.add_argument("--workers", type=int, default=4, help="Thread verifikasi password (default: 4)")
+    p.add_argument("--max-pending", type=int, default=8, help="Maks job hash berjalan + antre (default: 8)")
+    p.add_argument("--wait", type=float, default=0.5, help="Detik menunggu slot sebelum 'sibuk' (default: 0.5)")
+    p.add_argument("--iterations", type=int, default=600000, help="Iterasi PBKDF2 hash uji (default: 600000)")
+    p.add_argument("--email", help="Login ke user ini lewat database (default: hanya hash)")
+    p.add_argument("--password", default="benchmark-password", help="Password user --email / hash uji")
+    p.set_defaults(func=cmd_bench_login)
+
+    p = sub.add_parser("report", help="Ekspor laporan ke CSV/JSON tanpa membuka aplikasi Streamlit")
+    p.add_argument(
+        "report",
+        choices=[name.replace("_", "-") for name in export.EXPORT_REPORTS] + ["all"],
+        help="Laporan yang diekspor (all: semua laporan ke folder --output)",
+    )
+    p.add_argument("--year", type=int, help="Tahun laporan (default: tahun ini)")
+    p.add_argument("--start", type=date.fromisoformat, help="Tanggal awal YYYY-MM-DD (default: 1 Januari tahun --end)")
+    p.add_argument("--end", type=date.fromisoformat, help="Tanggal akhir YYYY-MM-DD (default: 31 Desember tahun --start)")
+    p.add_argument(
+        "--as-of", type=date.fromisoformat, help="Per tanggal YYYY-MM-DD: neraca per tanggal itu, laba rugi sejak 1 Januari"
+    )
+    p.add_argument("--company", type=int, help="ID accounting_company untuk header laporan (default: yang pertama)")
+    p.add_argument("--format", choices=sorted(export.WRITERS), default="csv", help="Format output (default: csv)")
+    p.add_argument("--output", help="File output (default: stdout); folder untuk 'all'")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("export-journal", help="Ekspor semua baris jurnal ke CSV/Parquet (streaming)")
+    p.add_argument("--year", type=int, help="Tahun (default: tahun ini)")
+    p.add_argument("--start", type=date.fromisoformat, help="Tanggal awal YYYY-MM-DD (pengganti --year)")
+    p.add_argument("--end", type=date.fromisoformat, help="Tanggal akhir YYYY-MM-DD")
+    p.add_argument("--format", choices=sorted(export.JOURNAL_LINE_FORMATS), default="csv", help="Format (default: csv)")
+    p.add_argument("--output", help="File output (default: stdout, hanya CSV)")
+    p.add_argument(
+        "--batch-size",
+        type=int,
+        default=export.STREAM_BATCH_SIZE,
+        help=f"Baris per batch dari database (default: {export.STREAM_BATCH_SIZE})",
+    )
+    p.set_defaults(func=cmd_export_journal)
+
+    p = sub.add_parser("import-journal", help="Import jurnal massal dari CSV/XLSX")
+    p.add_argument("file", help="File .csv/.xlsx: date, number, description, account_code, debit, credit")
+    p.add_argument("--adjustment", action="store_true", help="Import sebagai jurnal penyesuaian")
+    p.add_argument(
+        "--chunk-size",
+        type=int,
+        default=importer.IMPORT_CHUNK_SIZE,
+        help=f"Jurnal per transaksi (default: {importer.IMPORT_CHUNK_SIZE})",
+    )
+    p.add_argument("--rejects", help="Tulis baris yang ditolak beserta alasannya ke CSV ini")
+    p.add_argument("--dry-run", action="store_true", help="Hanya validasi, tidak menyimpan")
+    p.set_defaults(func=cmd_import_journal)
+
+    p = sub.add_parser("bench", help="Benchmark fungsi laporan dengan buku besar sintetis")
+    p.add_argument("--db", help="URL database benchmark, akan DIKOSONGKAN (default: file SQLite sementara)")
+    p.add_argument(
+        "--entries",
+        type=lambda text: [int(n) for n in text.split(",")],
+        default=[1000, 10000],
+        help="Jurnal per tahun, dipisah koma untuk beberapa ukuran (default: 1000,10000)",
+    )
+    p.add_argument(
+        "--accounts",
+        type=parse_accounts,
+        default=dict(bench.BENCH_ACCOUNTS),
+        help="Jumlah akun per tipe, mis. asset=50,expense=80 (default: seperti accounting_db.sql)",
+    )
+    p.add_argument("--lines-per-entry", type=int, default=2, help="Baris per jurnal (default: 2)")
+    p.add_argument("--adjustment-ratio", type=float, default=0.05, help="Porsi jurnal penyesuaian (default: 0.05)")
+    p.add_argument("--years", type=int, default=1, help="Jumlah tahun data; yang diukur tahun terakhir (default: 1)")
+    p.add_argument("--seed", type=int, default=0, help="Seed data acak (default: 0)")
+    p.add_argument("--fixture", action="store_true", help="Ukur juga data accounting_db.sql")
+    p.add_argument("--functions", help=f"Subset fungsi, dipisah koma (default: semua: {', '.join(bench.BENCH_FUNCTIONS)})")
+    p.add_argument("--repeat", type=int, default=5, help="Putaran per fungsi (default: 5)")
+    p.add_argument("--output", help="Tulis hasil ke file JSON ini")
+    p.add_argument("--compare", help="Bandingkan dengan file hasil sebelumnya")
+    p.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.25,
+        help="Rasio median baru/lama yang dianggap regresi, exit 1 (default: 1.25)",
+    )
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("startup-time", help="Ukur waktu import modul aplikasi (cold start)")
+    p.add_argument("modules", nargs="*", help=f"Modul yang diukur (default: {' '.join(STARTUP_MODULES)})")
+    p.add_argument("--repeat", type=int, default=5, help="Jumlah interpreter baru per modul (default: 5)")
+    p.add_argument("--budget-ms", type=float, help="Gagal (exit 1) jika ada modul melebihi waktu ini")
+    p.add_argument("--json", action="store_true", help="Hasil sebagai JSON (untuk dilacak antar rilis)")
+    p.set_defaults(func=cmd_startup_time)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # engine dibuat saat pertama dipakai, setelah DATABASE_URL diset
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Model SQLAlchemy: tabel Django (auth_user, django_session, accounting_*) dan
+tabel milik aplikasi ini (ringkasan saldo, indeks saldo harian, saldo akhir tahun,
+snapshot laporan).
+"""
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Boolean,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Numeric,
+    Text,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import declarative_base, relationship
+
+Base = declarative_base()
+
+
+# ============================================================
+# DEFINISI MODEL SQLALCHEMY (MAPPING KE TABEL DJANGO)
+# ============================================================
+
+class User(Base):
+    __tablename__ = "auth_user"
+
+    id = Column(Integer, primary_key=True)
+    password = Column(String(128), nullable=False)
+    last_login = Column(DateTime)
+    is_superuser = Column(Boolean, default=False)
+    username = Column(String(150), nullable=False)
+    first_name = Column(String(150), default="")
+    last_name = Column(String(150), default="")
+    email = Column(String(254), default="")
+    is_staff = Column(Boolean, default=False)
+    is_active = Column(Boolean, default=True)
+    date_joined = Column(DateTime)
+
+
+class LoginSession(Base):
+    # tabel sesi Django; session_data berisi JSON milik aplikasi ini
+    __tablename__ = "django_session"
+
+    session_key = Column(String(40), primary_key=True)
+    session_data = Column(Text, nullable=False)
+    expire_date = Column(DateTime, nullable=False, index=True)
+
+
+class Company(Base):
+    __tablename__ = "accounting_company"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), default="D'Pongs Wisata Keluarga")
+    logo = Column(String(100))  # path file, kita tidak gunakan di Streamlit
+    currency = Column(String(10), default="IDR")
+
+
+class Account(Base):
+    __tablename__ = "accounting_account"
+
+    id = Column(Integer, primary_key=True)
+    code = Column(String(20), unique=True, nullable=False)
+    name = Column(String(255), nullable=False)
+    account_type = Column(String(20), nullable=False)
+    is_active = Column(Boolean, default=True)
+
+    def __repr__(self):
+        return f"{self.code} {self.name}"
+
+
+class JournalEntry(Base):
+    __tablename__ = "accounting_journalentry"
+
+    id = Column(Integer, primary_key=True)
+    company_id = Column(Integer, ForeignKey("accounting_company.id"), nullable=True)
+    date = Column(Date, nullable=False)
+    number = Column(String(100), nullable=False)
+    description = Column(String, nullable=False)
+    is_adjustment = Column(Boolean, default=False)
+    created_by_id = Column(Integer, ForeignKey("auth_user.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # naik setiap edit lewat aplikasi; edit yang dibuka dari versi lama ditolak
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    company = relationship("Company")
+    created_by = relationship("User")
+    lines = relationship("JournalLine", back_populates="entry", order_by="JournalLine.id")
+
+
+class JournalLine(Base):
+    __tablename__ = "accounting_journalline"
+
+    id = Column(Integer, primary_key=True)
+    entry_id = Column(Integer, ForeignKey("accounting_journalentry.id"), nullable=False)
+    account_id = Column(Integer, ForeignKey("accounting_account.id"), nullable=False)
+    is_debit = Column(Boolean, nullable=False)
+    amount = Column(Numeric(18, 2), nullable=False)
+    tax_ppn = Column(Numeric(18, 2))
+
+    entry = relationship("JournalEntry", back_populates="lines")
+    account = relationship("Account")
+
+    def __repr__(self):
+        side = "D" if self.is_debit else "K"
+        return f"{self.entry.number} {self.account} {side} {self.amount}"
+
+
+class ClosingStatus(Base):
+    __tablename__ = "accounting_closingstatus"
+
+    id = Column(Integer, primary_key=True)
+    year = Column(Integer, unique=True, nullable=False)
+    is_closed = Column(Boolean, default=False)
+    closed_at = Column(DateTime, default=datetime.utcnow)
+
+
+class AccountMonthlyBalance(Base):
+    """
+    Ringkasan total debit/kredit per akun per bulan, dipisah jurnal umum dan
+    jurnal penyesuaian. Diperbarui setiap kali jurnal disimpan, diubah, atau
+    dihapus; laporan membaca dari tabel ini, bukan dari JournalLine.
+    """
+    __tablename__ = "accounting_accountmonthlybalance"
+    __table_args__ = (
+        UniqueConstraint("account_id", "year", "month", "is_adjustment"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey("accounting_account.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    is_adjustment = Column(Boolean, nullable=False, default=False)
+    debit = Column(Numeric(18, 2), nullable=False, default=0)
+    credit = Column(Numeric(18, 2), nullable=False, default=0)
+
+
+class AccountDailyBalance(Base):
+    """
+    Indeks saldo harian kumulatif: total debit/kredit per akun sejak 1 Januari
+    sampai dengan tanggal ini, dipisah jurnal umum dan penyesuaian. Satu baris
+    per akun per tanggal yang ada mutasinya; saldo per tanggal = baris
+    terakhir <= tanggal itu, mutasi satu rentang = selisih dua baris.
+    """
+    __tablename__ = "accounting_accountdailybalance"
+    __table_args__ = (
+        UniqueConstraint("account_id", "is_adjustment", "date"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey("accounting_account.id"), nullable=False)
+    date = Column(Date, nullable=False)
+    is_adjustment = Column(Boolean, nullable=False, default=False)
+    debit = Column(Numeric(18, 2), nullable=False, default=0)
+    credit = Column(Numeric(18, 2), nullable=False, default=0)
+
+
+class AccountYearEndBalance(Base):
+    """
+    Saldo akhir tahun per akun (debit - kredit kumulatif sejak transaksi
+    pertama, jurnal umum + penyesuaian), disimpan saat tahun ditutup. Neraca
+    tahun Y = saldo akhir Y-1 + mutasi tahun Y. Akun bersaldo nol tidak disimpan.
+    """
+    __tablename__ = "accounting_accountyearendbalance"
+    __table_args__ = (
+        UniqueConstraint("year", "account_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey("accounting_account.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    balance = Column(Numeric(18, 2), nullable=False, default=0)
+
+
+class ReportSnapshot(Base):
+    """
+    Laporan yang dibekukan untuk tahun yang sudah proses penyesuaian
+    (ClosingStatus.is_closed). Payload berupa JSON hasil fungsi laporan.
+    """
+    __tablename__ = "accounting_reportsnapshot"
+    __table_args__ = (
+        UniqueConstraint("year", "report"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    year = Column(Integer, nullable=False)
+    report = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Tabel milik aplikasi ini (bukan dari migrasi Django), dibuat lewat manage.py
+APP_TABLES = [
+    AccountMonthlyBalance.__table__,
+    AccountDailyBalance.__table__,
+    AccountYearEndBalance.__table__,
+    ReportSnapshot.__table__,
+]
+
+# Index untuk pola query laporan: filter rentang tanggal + is_adjustment pada
+# jurnal, lalu agregasi per akun pada baris jurnal. Dibuat lewat
+# "python manage.py migrate" (tabel Django hanya punya index FK satu kolom).
+# Index penutup berawalan entry_id/account_id/year juga melayani foreign key
+# dan filter satu kolom itu, jadi tidak perlu index satu kolom terpisah.
+REPORT_INDEXES = [
+    Index(
+        "accounting_journalentry_date_adj_idx",
+        JournalEntry.date,
+        JournalEntry.is_adjustment,
+        JournalEntry.id,
+    ),
+    Index(
+        "accounting_journalentry_adj_date_number_idx",
+        JournalEntry.is_adjustment,
+        JournalEntry.date,
+        JournalEntry.number,
+        JournalEntry.id,
+    ),
+    Index(
+        "accounting_journalline_account_cover_idx",
+        JournalLine.account_id,
+        JournalLine.entry_id,
+        JournalLine.is_debit,
+        JournalLine.amount,
+    ),
+    Index(
+        "accounting_journalline_entry_cover_idx",
+        JournalLine.entry_id,
+        JournalLine.account_id,
+        JournalLine.is_debit,
+        JournalLine.amount,
+    ),
+    Index(
+        "accounting_accountmonthlybalance_year_cover_idx",
+        AccountMonthlyBalance.year,
+        AccountMonthlyBalance.is_adjustment,
+        AccountMonthlyBalance.account_id,
+        AccountMonthlyBalance.debit,
+        AccountMonthlyBalance.credit,
+    ),
+]
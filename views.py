@@ -0,0 +1,1376 @@
+"""
+Halaman UI Streamlit. Dipisah dari app.py supaya satu halaman bisa diimpor
+(dan dirender ulang lewat AppTest) tanpa menjalankan main(); pandas baru
+diimpor saat halaman yang membuat tabel dirender.
+"""
+import calendar
+import io
+import json
+import tempfile
+from datetime import date
+
+import streamlit as st
+from sqlalchemy.orm import joinedload
+
+from accounting import (
+    JOURNAL_PAGE_SIZES,
+    LEDGER_MONEY_COLUMNS,
+    JournalConflict,
+    adjusted_trial_balance_from_worksheet,
+    build_ledger_frame,
+    build_report_snapshots,
+    cents_to_decimal,
+    delete_report_snapshots,
+    fetch_journal_page,
+    format_cents,
+    format_money_columns,
+    format_rupiah,
+    get_cached_reports,
+    get_cached_trends,
+    get_closed_years,
+    get_journal_totals,
+    get_ledger_data,
+    is_year_closed,
+    is_year_closed_cached,
+    journal_filter_conditions,
+    post_balance_delta,
+    refresh_report_snapshots,
+    report_period,
+    sum_cents,
+    to_cents,
+    update_journal_entry,
+)
+from auth import SESSION_COOKIE, LoginBusy, authenticate_email, get_login_sessions, session_user
+from db import current_year, get_session
+from export import JOURNAL_LINE_FORMATS, write_journal_lines
+from importer import import_journal_rows, read_journal_file, write_rejected
+from models import Account, ClosingStatus, JournalEntry, JournalLine
+
+# ============================================================
+# HALAMAN UI STREAMLIT
+# ============================================================
+
+# pilihan periode laporan; default tahun penuh
+REPORT_PERIODS = ("Tahun penuh", "Bulan", "Kuartal", "Rentang tanggal", "Per tanggal")
+MONTH_NAMES = (
+    "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+    "Juli", "Agustus", "September", "Oktober", "November", "Desember",
+)
+
+
+def select_report_period(key: str):
+    """
+    Input tahun lalu periode laporan (tahun penuh, bulan, kuartal, rentang
+    tanggal, atau per tanggal). Hasil: (tanggal awal, tanggal akhir).
+    """
+    year = st.number_input("Tahun", min_value=2000, max_value=2100, value=current_year(), step=1)
+    mode = st.selectbox("Periode", REPORT_PERIODS, key=f"period_{key}")
+
+    if mode == "Bulan":
+        month = st.selectbox(
+            "Bulan", range(1, 13), format_func=lambda m: MONTH_NAMES[m - 1], key=f"period_month_{key}"
+        )
+        return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+    if mode == "Kuartal":
+        quarter = st.selectbox("Kuartal", (1, 2, 3, 4), format_func=lambda q: f"Q{q}", key=f"period_quarter_{key}")
+        last_month = quarter * 3
+        return date(year, last_month - 2, 1), date(year, last_month, calendar.monthrange(year, last_month)[1])
+
+    if mode == "Rentang tanggal":
+        c1, c2 = st.columns(2)
+        start = c1.date_input("Dari tanggal", value=date(year, 1, 1), key=f"period_start_{key}_{year}")
+        end = c2.date_input("Sampai tanggal", value=date(year, 12, 31), key=f"period_end_{key}_{year}")
+        if start > end:
+            st.error("Tanggal awal harus sebelum tanggal akhir.")
+            st.stop()
+        return start, end
+
+    if mode == "Per tanggal":
+        as_of = st.date_input(
+            "Per tanggal", value=min(date.today(), date(year, 12, 31)), key=f"period_as_of_{key}_{year}"
+        )
+        return report_period(as_of=as_of)
+
+    return report_period(year)
+
+
+def write_session_cookie(token: str = None):
+    """
+    Tulis token sesi ke cookie browser (token None = hapus cookie). Streamlit
+    tidak bisa mengirim Set-Cookie, jadi cookie ditulis lewat komponen HTML
+    ke dokumen induk; token tidak pernah masuk URL.
+    """
+    import streamlit.components.v1 as components
+
+    max_age = get_login_sessions().max_age if token else 0
+    cookie = f"{SESSION_COOKIE}={token or ''}; Max-Age={max_age}; Path=/; SameSite=Strict"
+    components.html(
+        "<script>"
+        f"var cookie = {json.dumps(cookie)};"
+        "if (window.parent.location.protocol === 'https:') cookie += '; Secure';"
+        "window.parent.document.cookie = cookie;"
+        "</script>",
+        height=0,
+    )
+
+
+def restore_login():
+    """
+    Pulihkan login setelah refresh/reconnect dari cookie sesi. Token yang
+    sudah setengah umur diganti token baru (cookie ditulis ulang di render ini).
+    """
+    # token lama di URL (?sid=) tidak dipakai lagi, cukup dibuang dari URL
+    if "sid" in st.query_params:
+        del st.query_params["sid"]
+
+    token = st.context.cookies.get(SESSION_COOKIE)
+    if not token:
+        return
+    store = get_login_sessions()
+    user = store.validate(token)
+    if user is None:
+        return
+    if store.needs_rotation(token):
+        with get_session() as session:
+            token = store.rotate(session, token, user)
+            session.commit()
+        store.remember(token, user)
+        st.session_state["session_cookie"] = token
+    st.session_state["sid"] = token
+    st.session_state["user"] = user
+
+
+def login_page():
+    st.title("Login")
+
+    # cookie sesi yang sudah tidak berlaku (logout, kedaluwarsa) dihapus dari browser
+    if st.session_state.pop("clear_session_cookie", False) or st.context.cookies.get(SESSION_COOKIE):
+        write_session_cookie(None)
+
+    with st.form("login_form"):
+        email = st.text_input("Email")
+        password = st.text_input("Password", type="password")
+        submitted = st.form_submit_button("Masuk")
+
+    if submitted:
+        if not email or not password:
+            st.error("Email dan password wajib diisi")
+            return
+
+        try:
+            user = authenticate_email(email, password)
+        except LoginBusy:
+            st.warning("Server sedang memproses banyak login. Silakan coba lagi beberapa detik lagi.")
+            return
+
+        if user:
+            with get_session() as session:
+                token = get_login_sessions().create(session, user)
+                session.commit()
+            get_login_sessions().remember(token, session_user(user))
+            st.session_state["sid"] = token
+            # ditulis ke cookie pada render berikutnya (setelah st.rerun)
+            st.session_state["session_cookie"] = token
+            st.session_state["user"] = session_user(user)
+            st.success("Login berhasil")
+            st.rerun()
+        else:
+            st.error("Email atau password salah")
+
+
+
+def page_dashboard():
+    st.header("Dashboard")
+    year = st.number_input("Tahun", min_value=2000, max_value=2100, value=current_year(), step=1)
+
+    with get_session() as session:
+        reports = get_cached_reports(session, year, "income_statement", "capital_statement", "balance_sheet")
+        closed = is_year_closed_cached(session, year)
+
+    total_rev = reports["income_statement"]["total_revenue"]
+    total_exp = reports["income_statement"]["total_expense"]
+    net_income = reports["income_statement"]["net_income"]
+    total_asset = reports["balance_sheet"]["total_aktiva"]
+    total_liab = reports["balance_sheet"]["total_liabilitas"]
+    total_equity = reports["capital_statement"]["total_equity"]
+
+    # Format angka dengan pemisah ribuan
+    def format_currency(cents):
+        return f"Rp {cents_to_decimal(cents):,.2f}"
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Pendapatan", format_currency(total_rev))
+    col2.metric("Total Beban", format_currency(total_exp))
+    
+    # Tampilkan laba/rugi dengan warna yang sesuai
+    if net_income >= 0:
+        col3.metric("Laba Bersih", format_currency(net_income), delta="Laba")
+    else:
+        col3.metric("Rugi Bersih", format_currency(abs(net_income)), delta_color="inverse", delta="Rugi")
+
+    st.markdown("---")
+    
+    # Informasi detail laba/rugi
+    st.subheader("Detail Laba/Rugi")
+    st.write(f"**Pendapatan:** {format_currency(total_rev)}")
+    st.write(f"**Beban:** {format_currency(total_exp)}")
+    st.write(f"**{'Laba' if net_income >= 0 else 'Rugi'} Bersih:** {format_currency(abs(net_income))}")
+
+    st.markdown("---")
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Total Aset", format_currency(total_asset))
+    c2.metric("Total Liabilitas", format_currency(total_liab))
+    c3.metric("Total Ekuitas", format_currency(total_equity))
+
+    st.markdown("---")
+    
+    # Rasio keuangan sederhana
+    st.subheader("Rasio Keuangan")
+    if total_rev > 0:
+        profit_margin = (net_income / total_rev) * 100
+        st.write(f"**Profit Margin:** {profit_margin:.2f}%")
+    
+    if total_asset > 0:
+        debt_ratio = (total_liab / total_asset) * 100
+        st.write(f"**Debt Ratio:** {debt_ratio:.2f}%")
+
+    st.markdown("---")
+    st.write(f"**Status tahun {year}:** {'Proses penyesuaian' if closed else '🔓 Belum proses penyesuaian'}")
+
+    st.markdown("---")
+    if st.toggle("Mode perbandingan antar tahun"):
+        show_dashboard_trends(year)
+
+
+# kolom get_trend_data() -> label grafik/tabel
+TREND_LABELS = {
+    "revenue": "Pendapatan",
+    "expense": "Beban",
+    "net_income": "Laba Bersih",
+    "asset": "Aset",
+    "liability": "Liabilitas",
+    "equity": "Ekuitas",
+}
+
+
+def show_dashboard_trends(year: int):
+    """Grafik tren pendapatan, beban, laba, neraca, dan rasio untuk rentang tahun."""
+    import pandas as pd
+
+    st.subheader("Tren Keuangan")
+    c1, c2 = st.columns([3, 1])
+    start_year, end_year = c1.slider("Rentang tahun", 2000, 2100, (max(year - 4, 2000), year))
+    monthly = c2.checkbox("Per bulan")
+
+    with get_session() as session:
+        trends = get_cached_trends(session, start_year, end_year, monthly)
+
+    if monthly:
+        periods = pd.Index([f"{y}-{m:02d}" for y, m in trends.index], name="Periode")
+    else:
+        periods = pd.Index([str(y) for y in trends.index], name="Periode")
+    trends = trends.rename(columns=TREND_LABELS).set_axis(periods)
+    money = list(TREND_LABELS.values())
+    ratios = {"profit_margin": "Profit Margin", "debt_ratio": "Debt Ratio"}
+
+    # grafik dalam rupiah, tabel diformat dari int sen
+    rupiah = trends[money] / 100
+    st.write("**Pendapatan, Beban, dan Laba Bersih**")
+    st.line_chart(rupiah[["Pendapatan", "Beban", "Laba Bersih"]])
+    st.write("**Aset, Liabilitas, dan Ekuitas**" + (" (saldo akhir bulan)" if monthly else ""))
+    st.bar_chart(rupiah[["Aset", "Liabilitas", "Ekuitas"]], stack=False)
+    st.write("**Rasio Keuangan (%)**")
+    st.line_chart(trends[list(ratios)].rename(columns=ratios))
+
+    table = format_money_columns(trends[money], *money)
+    for column, label in ratios.items():
+        table[label] = trends[column].map(lambda v: f"{v:.2f}%" if pd.notna(v) else "-")
+    st.dataframe(table, use_container_width=True)
+
+
+def page_journal(is_adjustment: bool = False):
+    import pandas as pd
+
+    title = "Jurnal Penyesuaian" if is_adjustment else "Jurnal Umum"
+    key_suffix = "adj" if is_adjustment else "gen"
+
+    st.header(title)
+    year = st.number_input("Tahun", min_value=2000, max_value=2100, value=current_year(), step=1)
+
+    with get_session() as session:
+        closed = is_year_closed(session, year)
+
+        # ambil daftar akun untuk filter dan form
+        accounts = (
+            session.query(Account)
+            .filter(Account.is_active == True)
+            .order_by(Account.code)
+            .all()
+        )
+        account_options = {f"{a.code} - {a.name}": a.id for a in accounts}
+        account_labels = list(account_options.keys())
+
+        # ===========================
+        # FILTER + PAGINATION
+        # ===========================
+        with st.expander("Filter Jurnal"):
+            f1, f2, f3 = st.columns(3)
+            date_from = f1.date_input(
+                "Dari tanggal", value=date(year, 1, 1), key=f"filter_from_{key_suffix}_{year}"
+            )
+            date_to = f2.date_input(
+                "Sampai tanggal", value=date(year, 12, 31), key=f"filter_to_{key_suffix}_{year}"
+            )
+            number_prefix = f3.text_input("Nomor diawali", key=f"filter_number_{key_suffix}")
+
+            f4, f5, f6 = st.columns(3)
+            filter_account = f4.selectbox(
+                "Akun", options=["(semua)"] + account_labels, key=f"filter_account_{key_suffix}"
+            )
+            amount_min = f5.number_input(
+                "Jumlah minimal (Rp)", min_value=0.0, step=1000.0, key=f"filter_min_{key_suffix}"
+            )
+            amount_max = f6.number_input(
+                "Jumlah maksimal (Rp)", min_value=0.0, step=1000.0, key=f"filter_max_{key_suffix}",
+                help="0 = tanpa batas",
+            )
+
+        page_size = st.selectbox(
+            "Jurnal per halaman", options=JOURNAL_PAGE_SIZES, index=1, key=f"page_size_{key_suffix}"
+        )
+
+        conditions = journal_filter_conditions(
+            is_adjustment,
+            date_from=max(date_from, date(year, 1, 1)),
+            date_to=min(date_to, date(year, 12, 31)),
+            number_prefix=number_prefix,
+            account_id=account_options.get(filter_account),
+            amount_min=amount_min or None,
+            amount_max=amount_max or None,
+        )
+
+        # cursor keyset tiap halaman; kembali ke halaman pertama saat filter berubah
+        cursor_key = f"journal_cursors_{key_suffix}"
+        filter_sig = (year, date_from, date_to, number_prefix, filter_account, amount_min, amount_max, page_size)
+        if st.session_state.get(f"journal_filter_{key_suffix}") != filter_sig:
+            st.session_state[f"journal_filter_{key_suffix}"] = filter_sig
+            st.session_state[cursor_key] = [None]
+        cursors = st.session_state[cursor_key]
+
+        entries, has_next = fetch_journal_page(session, conditions, after=cursors[-1], page_size=page_size)
+        entry_count, total_debit, total_credit = get_journal_totals(session, conditions)
+
+        table_rows = []
+        entry_totals = {}  # key: entry.id, value: (debit, kredit)
+
+        for e in entries:
+            entry_debit = 0
+            entry_credit = 0
+            for line in e.lines:
+                amt = to_cents(line.amount)
+                if line.is_debit:
+                    entry_debit += amt
+                else:
+                    entry_credit += amt
+
+                table_rows.append(
+                    {
+                        "Tanggal": e.date.strftime("%d-%m-%Y"),
+                        "No": e.number,
+                        "Keterangan": e.description,
+                        "Akun": f"{line.account.code} {line.account.name}",
+                        "Debit": amt if line.is_debit else None,
+                        "Kredit": amt if not line.is_debit else None,
+                    }
+                )
+
+            entry_totals[e.id] = (entry_debit, entry_credit)
+
+        # ===========================
+        # TABEL + TOMBOL EDIT/DELETE
+        # ===========================
+        st.subheader("Daftar Jurnal")
+
+        if table_rows:
+            df = pd.DataFrame(table_rows)
+
+            # baris total di tabel (seluruh jurnal yang cocok dengan filter, bukan hanya halaman ini)
+            total_row = {
+                "Tanggal": "",
+                "No": "",
+                "Keterangan": "**Total**",
+                "Akun": "",
+                "Debit": total_debit,
+                "Kredit": total_credit,
+            }
+            df = pd.concat([df, pd.DataFrame([total_row])], ignore_index=True)
+
+            # Tampilkan dataframe tanpa index, baris total ditebalkan
+            shown = format_money_columns(df, "Debit", "Kredit")
+            for column in ("Debit", "Kredit"):
+                shown.loc[shown.index[-1], column] = f"**{shown[column].iloc[-1]}**"
+            st.dataframe(shown, use_container_width=True, hide_index=True)
+
+            # navigasi halaman
+            page_no = len(cursors)
+            total_pages = max(1, -(-entry_count // page_size))
+            n1, n2, n3 = st.columns([1, 4, 1])
+            if n1.button("‹ Sebelumnya", key=f"prev_page_{key_suffix}", disabled=page_no == 1):
+                cursors.pop()
+                st.rerun()
+            n2.write(f"Halaman {page_no} dari {total_pages} ({entry_count} jurnal)")
+            if n3.button("Berikutnya ›", key=f"next_page_{key_suffix}", disabled=not has_next):
+                last = entries[-1]
+                cursors.append((last.date, last.number, last.id))
+                st.rerun()
+
+            # tombol edit/delete per entry
+            st.subheader("Aksi Jurnal")
+            for e in entries:
+                cols = st.columns([6, 1, 1])
+                cols[0].write(f"**{e.date.strftime('%d-%m-%Y')}** | **{e.number}** | {e.description}")
+                
+                entry_debit, entry_credit = entry_totals[e.id]
+                cols[0].write(f"Debit: {format_cents(entry_debit)} | Kredit: {format_cents(entry_credit)}")
+
+                if cols[1].button("Edit", key=f"edit_{key_suffix}_{e.id}"):
+                    st.session_state[f"edit_entry_id_{key_suffix}"] = e.id
+                    # versi saat form dibuka, dicek lagi saat disimpan
+                    st.session_state[f"edit_version_{key_suffix}"] = e.version
+                    st.session_state.pop(f"edit_conflict_{key_suffix}", None)
+                    st.rerun()
+
+                if cols[2].button("Delete", key=f"delete_{key_suffix}_{e.id}"):
+                    st.session_state[f"delete_entry_id_{key_suffix}"] = e.id
+                    st.rerun()
+
+        else:
+            st.info("Belum ada data jurnal untuk tahun ini.")
+
+        # ===========================
+        # FORM EDIT JURNAL
+        # ===========================
+        edit_key = f"edit_entry_id_{key_suffix}"
+        version_key = f"edit_version_{key_suffix}"
+        conflict_key = f"edit_conflict_{key_suffix}"
+        entry = None
+        if edit_key in st.session_state:
+            entry = session.query(JournalEntry).filter(JournalEntry.id == st.session_state[edit_key]).first()
+            if entry is None:
+                st.warning("Jurnal yang sedang diedit sudah dihapus user lain.")
+                for key in (edit_key, version_key, conflict_key):
+                    st.session_state.pop(key, None)
+
+        if entry is not None:
+            edit_id = entry.id
+
+            st.markdown("---")
+            st.subheader("Edit Jurnal")
+
+            version = st.session_state.setdefault(version_key, entry.version)
+            if conflict_key in st.session_state:
+                # tampilkan data terbaru; muat ulang = form dari versi terbaru
+                st.error(st.session_state[conflict_key])
+                st.write(f"Versi terbaru (versi {entry.version}): {entry.date} | {entry.number} | {entry.description}")
+                for line in entry.lines:
+                    side = "Debit" if line.is_debit else "Kredit"
+                    st.write(f"- {line.account.code} - {line.account.name}: {side} {format_rupiah(line.amount)}")
+                if st.button("Muat ulang jurnal", key=f"reload_edit_{key_suffix}"):
+                    st.session_state[version_key] = entry.version
+                    del st.session_state[conflict_key]
+                    st.rerun()
+
+            lines = (
+                session.query(JournalLine)
+                .options(joinedload(JournalLine.account))
+                .filter(JournalLine.entry_id == edit_id)
+                .order_by(JournalLine.id)
+                .all()
+            )
+
+            # key widget memuat versi, supaya muat ulang mengisi form dari data terbaru
+            form_key = f"{key_suffix}_{edit_id}_{version}"
+            with st.form(f"form_edit_{key_suffix}"):
+                col1, col2 = st.columns(2)
+                new_date = col1.date_input("Tanggal", value=entry.date, key=f"edit_date_{form_key}")
+                new_number = col2.text_input("Nomor", value=entry.number, key=f"edit_number_{form_key}")
+                new_desc = st.text_input("Keterangan", value=entry.description, key=f"edit_desc_{form_key}")
+
+                st.write("Edit Baris Jurnal:")
+                edited_lines = []
+                
+                # Tampilkan total sementara
+                temp_debit = 0
+                temp_credit = 0
+
+                # baris tersimpan + satu baris kosong untuk tambahan
+                for idx, l in enumerate(lines + [None]):
+                    c1, c2, c3, c4, c5 = st.columns([3, 1, 2, 1, 1])
+                    line_key = f"{form_key}_{l.id if l else 'new'}"
+
+                    acc_label = c1.selectbox(
+                        f"Akun {idx + 1}",
+                        options=account_labels if l else ["(pilih)"] + account_labels,
+                        index=account_labels.index(f"{l.account.code} - {l.account.name}") if l else 0,
+                        key=f"edit_acc_{line_key}",
+                    )
+                    is_debit_line = c2.checkbox(
+                        "Debit",
+                        value=l.is_debit if l else True,
+                        key=f"edit_deb_{line_key}",
+                    )
+                    amount_line = c3.number_input(
+                        "Jumlah (Rp)",
+                        value=float(l.amount) if l else 0.0,
+                        step=1000.0,
+                        key=f"edit_amt_{line_key}",
+                    )
+                    removed = c5.checkbox("Hapus", key=f"edit_del_{line_key}") if l else False
+
+                    c4.write("")  # Spacer
+                    c4.write(f"**{format_rupiah(amount_line)}**")
+
+                    if removed or (l is None and (acc_label == "(pilih)" or amount_line <= 0)):
+                        continue
+
+                    # Hitung total sementara
+                    if is_debit_line:
+                        temp_debit += to_cents(amount_line)
+                    else:
+                        temp_credit += to_cents(amount_line)
+
+                    edited_lines.append((l.id if l else None, acc_label, is_debit_line, amount_line))
+
+                # Tampilkan total
+                st.write(f"**Total Debit: {format_cents(temp_debit)}**")
+                st.write(f"**Total Kredit: {format_cents(temp_credit)}**")
+                
+                if temp_debit != temp_credit:
+                    st.error("❌ Total debit dan kredit harus seimbang!")
+                else:
+                    st.success("✅ Debit dan kredit balance")
+
+                saved = st.form_submit_button("Simpan Perubahan")
+
+            if saved:
+                # Validasi balance
+                calc_debit = sum_cents(to_cents(amt) for _, _, is_debit, amt in edited_lines if is_debit)
+                calc_credit = sum_cents(to_cents(amt) for _, _, is_debit, amt in edited_lines if not is_debit)
+                
+                if not edited_lines:
+                    st.error("Minimal satu baris jurnal harus diisi.")
+                elif calc_debit != calc_credit:
+                    st.error("Total debit dan kredit harus seimbang!")
+                else:
+                    old_date = entry.date
+                    try:
+                        # hanya header/baris yang berubah yang ditulis
+                        update_journal_entry(
+                            session,
+                            edit_id,
+                            version,
+                            new_date,
+                            new_number,
+                            new_desc,
+                            [
+                                (line_id, account_options[acc_label], is_debit_line, amount_line)
+                                for line_id, acc_label, is_debit_line, amount_line in edited_lines
+                            ],
+                        )
+                    except JournalConflict as exc:
+                        session.rollback()
+                        st.session_state[conflict_key] = str(exc)
+                        st.rerun()
+
+                    refresh_report_snapshots(session, old_date.year, new_date.year)
+
+                    session.commit()
+                    st.success("Jurnal berhasil diperbarui.")
+                    del st.session_state[edit_key]
+                    st.session_state.pop(version_key, None)
+                    st.rerun()
+
+        # ===========================
+        # KONFIRMASI DELETE
+        # ===========================
+        delete_key = f"delete_entry_id_{key_suffix}"
+        if delete_key in st.session_state:
+            del_id = st.session_state[delete_key]
+
+            st.markdown("---")
+            st.error("Anda yakin ingin menghapus jurnal ini?")
+
+            # Tampilkan detail jurnal yang akan dihapus
+            entry_to_delete = session.query(JournalEntry).filter(JournalEntry.id == del_id).first()
+            if entry_to_delete:
+                st.write(f"**Tanggal:** {entry_to_delete.date}")
+                st.write(f"**Nomor:** {entry_to_delete.number}")
+                st.write(f"**Keterangan:** {entry_to_delete.description}")
+                
+                lines_to_delete = (
+                    session.query(JournalLine)
+                    .options(joinedload(JournalLine.account))
+                    .filter(JournalLine.entry_id == del_id)
+                    .all()
+                )
+                for line in lines_to_delete:
+                    side = "Debit" if line.is_debit else "Kredit"
+                    st.write(f"- {line.account.code} - {line.account.name}: {side} {format_rupiah(line.amount)}")
+
+            c1, c2 = st.columns(2)
+            if c1.button("Ya, hapus", key=f"confirm_del_{key_suffix}"):
+                if entry_to_delete:
+                    post_balance_delta(
+                        session,
+                        entry_to_delete.date,
+                        entry_to_delete.is_adjustment,
+                        [
+                            (l.account_id, l.is_debit, l.amount)
+                            for l in session.query(JournalLine).filter(JournalLine.entry_id == del_id)
+                        ],
+                        sign=-1,
+                    )
+                session.query(JournalLine).filter(JournalLine.entry_id == del_id).delete()
+                session.query(JournalEntry).filter(JournalEntry.id == del_id).delete()
+                if entry_to_delete:
+                    refresh_report_snapshots(session, entry_to_delete.date.year)
+                session.commit()
+
+                st.success("Jurnal sudah dihapus.")
+                del st.session_state[delete_key]
+                st.rerun()
+
+            if c2.button("Batal", key=f"cancel_del_{key_suffix}"):
+                del st.session_state[delete_key]
+                st.rerun()
+
+        st.markdown("---")
+
+        # ===========================
+        # IMPORT CSV / EXCEL
+        # ===========================
+        with st.expander(f"Import {title} dari CSV/Excel"):
+            st.caption(
+                "Satu baris per baris jurnal, kolom: date, number, description, account_code, "
+                "debit, credit. Baris dengan tanggal dan nomor sama menjadi satu jurnal."
+            )
+            upload = st.file_uploader("File", type=["csv", "xlsx"], key=f"import_{key_suffix}")
+            if upload is not None and st.button("Import", key=f"import_run_{key_suffix}"):
+                try:
+                    rows = read_journal_file(upload, upload.name)
+                except (ValueError, ImportError) as e:
+                    st.error(str(e))
+                    rows = None
+
+                if rows is not None:
+                    with st.spinner("Mengimpor jurnal..."):
+                        result = import_journal_rows(
+                            session,
+                            rows,
+                            is_adjustment=is_adjustment,
+                            created_by_id=st.session_state["user"]["id"],
+                        )
+                    st.success(f"Diimpor: {result['entries']} jurnal, {result['lines']} baris.")
+
+                    rejected = result["rejected"]
+                    if len(rejected):
+                        st.error(f"Ditolak: {len(rejected)} baris dari {len(rows)}.")
+                        st.dataframe(rejected.head(1000), use_container_width=True)
+                        buffer = io.StringIO()
+                        write_rejected(rejected, buffer)
+                        st.download_button(
+                            "Unduh baris ditolak (CSV)",
+                            buffer.getvalue(),
+                            file_name=f"ditolak_{upload.name.rsplit('.', 1)[0]}.csv",
+                            mime="text/csv",
+                            key=f"import_rejects_{key_suffix}",
+                        )
+
+        # ===========================
+        # RULE TUTUP BUKU UNTUK INPUT BARU
+        # ===========================
+        if is_adjustment and not closed:
+            st.warning(f"Tahun {year} belum proses penyesuaian, jurnal penyesuaian tidak bisa dibuat.")
+            return
+
+        if (not is_adjustment) and closed:
+            st.warning(f"Tahun {year} sudah proses penyesuaian, jurnal umum baru tidak bisa dibuat.")
+            return
+
+        # ===========================
+        # FORM TAMBAH JURNAL BARU
+        # ===========================
+        st.subheader(f"Tambah {title}")
+
+        with st.form(f"form_{key_suffix}"):
+            col_date, col_number = st.columns(2)
+            trans_date = col_date.date_input("Tanggal", value=date.today())
+            number = col_number.text_input("Nomor", value="")
+
+            description = st.text_input("Keterangan", value="")
+
+            num_lines = st.number_input("Jumlah baris", min_value=2, max_value=10, value=2, step=1)
+
+            line_inputs = []
+            temp_total_debit = 0
+            temp_total_credit = 0
+            
+            st.write("**Detail Transaksi:**")
+            for i in range(int(num_lines)):
+                c1, c2, c3, c4 = st.columns([3, 1, 2, 2])
+                acc_label = c1.selectbox(
+                    "Akun",
+                    options=["(pilih)"] + account_labels,
+                    key=f"acc_{key_suffix}_{i}",
+                )
+                is_debit_line = c2.checkbox(
+                    "Debit",
+                    value=(i == 0),
+                    key=f"debit_{key_suffix}_{i}",
+                )
+                amount_line = c3.number_input(
+                    "Jumlah (Rp)",
+                    min_value=0.0,
+                    step=1000.0,
+                    key=f"amount_{key_suffix}_{i}",
+                )
+                
+                # Hitung total sementara
+                if acc_label != "(pilih)" and amount_line > 0:
+                    if is_debit_line:
+                        temp_total_debit += to_cents(amount_line)
+                    else:
+                        temp_total_credit += to_cents(amount_line)
+                
+                # Tampilkan format Rupiah
+                amount_display = format_rupiah(amount_line) if amount_line > 0 else "-"
+                c4.write(f"**{amount_display}**")
+
+                line_inputs.append((acc_label, is_debit_line, amount_line))
+
+            # Tampilkan total
+            st.write(f"**Total Debit: {format_cents(temp_total_debit)}**")
+            st.write(f"**Total Kredit: {format_cents(temp_total_credit)}**")
+            
+            if temp_total_debit != temp_total_credit:
+                st.error("❌ Total debit dan kredit harus seimbang!")
+            else:
+                st.success("✅ Debit dan kredit balance")
+
+            submitted = st.form_submit_button("Simpan Jurnal")
+
+        if submitted:
+            if not number:
+                st.error("Nomor transaksi wajib diisi.")
+                return
+            if not description:
+                st.error("Keterangan wajib diisi.")
+                return
+
+            debit_sum = 0
+            credit_sum = 0
+            valid_lines = []
+
+            for acc_label, is_debit_line, amount_line in line_inputs:
+                if acc_label == "(pilih)" or amount_line <= 0:
+                    continue
+                account_id = account_options.get(acc_label)
+                if not account_id:
+                    continue
+                amt = to_cents(amount_line)
+                if is_debit_line:
+                    debit_sum += amt
+                else:
+                    credit_sum += amt
+                valid_lines.append((account_id, is_debit_line, cents_to_decimal(amt)))
+
+            if not valid_lines:
+                st.error("Minimal satu baris jurnal harus diisi.")
+                return
+
+            if debit_sum != credit_sum:
+                st.error("Total debit dan kredit harus seimbang.")
+                return
+
+            # Simpan ke DB
+            entry = JournalEntry(
+                date=trans_date,
+                number=number,
+                description=description,
+                is_adjustment=is_adjustment,
+                created_by_id=st.session_state["user"]["id"],
+            )
+            session.add(entry)
+            session.flush()
+
+            for account_id, is_debit_line, amt in valid_lines:
+                session.add(
+                    JournalLine(
+                        entry_id=entry.id,
+                        account_id=account_id,
+                        is_debit=is_debit_line,
+                        amount=amt,
+                    )
+                )
+
+            post_balance_delta(session, trans_date, is_adjustment, valid_lines)
+            refresh_report_snapshots(session, trans_date.year)
+
+            session.commit()
+            st.success("Jurnal berhasil disimpan.")
+            st.rerun()
+
+
+def page_ledger():
+    st.header("Buku Besar")
+    period_start, period_end = select_report_period("ledger")
+    year = period_start.year
+
+    with st.expander("Ekspor semua baris jurnal (CSV/Parquet)"):
+        c1, c2, c3 = st.columns(3)
+        start = c1.date_input("Dari", value=date(year, 1, 1), key="export_start")
+        end = c2.date_input("Sampai", value=date(year, 12, 31), key="export_end")
+        fmt = c3.selectbox("Format", list(JOURNAL_LINE_FORMATS), key="export_format")
+        mode, mime = JOURNAL_LINE_FORMATS[fmt][1:]
+
+        def build_export_file():
+            # dijalankan saat tombol diklik: baris jurnal ditulis per batch ke file sementara
+            f = tempfile.TemporaryFile()
+            with get_session() as session:
+                if mode == "w":
+                    text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+                    write_journal_lines(session, fmt, text, start, end)
+                    text.flush()
+                    text.detach()
+                else:
+                    write_journal_lines(session, fmt, f, start, end)
+            f.seek(0)
+            return f
+
+        if start > end:
+            st.error("Tanggal awal harus sebelum tanggal akhir.")
+        else:
+            st.download_button(
+                "Unduh baris jurnal",
+                build_export_file,
+                file_name=f"jurnal_{start}_{end}.{fmt}",
+                mime=mime,
+                key="export_download",
+            )
+
+    # buku besar tidak disimpan di cache laporan: baris per transaksi terlalu
+    # besar untuk ditahan per rentang tanggal
+    with get_session() as session:
+        accounts = (
+            session.query(Account.id, Account.code, Account.name)
+            .filter(Account.is_active == True)
+            .order_by(Account.code)
+            .all()
+        )
+        ledger = get_ledger_data(session, start=period_start, end=period_end)
+
+    for acc_id, acc_code, acc_name in accounts:
+        st.markdown(f"### {acc_code} - {acc_name}")
+
+        lines = ledger.get(acc_id)
+        if not lines:
+            st.write("Tidak ada transaksi")
+            st.markdown("---")
+            continue
+
+        df = build_ledger_frame(lines)
+        st.dataframe(format_money_columns(df, *LEDGER_MONEY_COLUMNS), use_container_width=True, hide_index=True)
+
+        st.markdown("---")
+
+
+def page_trial_balance():
+    import pandas as pd
+
+    st.header("Neraca Saldo")
+    start, end = select_report_period("trial_balance")
+
+    with get_session() as session:
+        reports = get_cached_reports(session, None, "trial_balance", start=start, end=end)
+    rows, total_debit, total_credit = reports["trial_balance"]
+
+    if rows:
+        # tambah row akhir (Total); rows milik cache, jangan diubah
+        rows = rows + [{
+            "Kode Akun": "Total",
+            "Nama Akun": "",
+            "Debit": total_debit,
+            "Kredit": total_credit
+        }]
+
+        df = pd.DataFrame(rows)
+        st.dataframe(format_money_columns(df, "Debit", "Kredit"), use_container_width=True)
+        
+        # Info balance check
+        if total_debit == total_credit:
+            st.success("✅ Debit dan Kredit Balance")
+        else:
+            st.error("❌ Debit dan Kredit Tidak Balance")
+    else:
+        st.info("Belum ada data neraca saldo untuk tahun ini.")
+
+
+def page_adjusted_trial_balance():
+    import pandas as pd
+
+    st.header("Neraca Saldo Setelah Penyesuaian")
+    start, end = select_report_period("adjusted_trial_balance")
+
+    with get_session() as session:
+        worksheet = get_cached_reports(session, None, "adjusted_trial_balance", start=start, end=end)[
+            "adjusted_trial_balance"
+        ]
+
+    rows, total_debit, total_credit = adjusted_trial_balance_from_worksheet(worksheet)
+
+    if rows:
+        rows.append({
+            "Kode Akun": "Total",
+            "Nama Akun": "",
+            "Debit": total_debit,
+            "Kredit": total_credit
+        })
+
+        df = pd.DataFrame(rows)
+        st.dataframe(format_money_columns(df, "Debit", "Kredit"), use_container_width=True)
+        
+        # Info balance check
+        if total_debit == total_credit:
+            st.success("✅ Debit dan Kredit Balance")
+        else:
+            st.error("❌ Debit dan Kredit Tidak Balance")
+    else:
+        st.info("Belum ada data neraca saldo setelah penyesuaian untuk tahun ini.")
+
+    # ===========================
+    # KERTAS KERJA PENYESUAIAN
+    # ===========================
+    if worksheet:
+        st.subheader("Kertas Kerja Penyesuaian")
+
+        def split(value):
+            # saldo (debit - kredit) dipecah ke kolom debit / kredit
+            if value >= 0:
+                return value, None
+            return None, -value
+
+        ws_rows = []
+        for item in worksheet:
+            ns_debit, ns_credit = split(item["unadjusted"])
+            adj_debit, adj_credit = split(item["adjustment"]) if item["adjustment"] != 0 else (None, None)
+            nsp_debit, nsp_credit = split(item["adjusted"])
+            ws_rows.append(
+                {
+                    "Kode Akun": item["code"],
+                    "Nama Akun": item["name"],
+                    "NS Debit": ns_debit,
+                    "NS Kredit": ns_credit,
+                    "Penyesuaian Debit": adj_debit,
+                    "Penyesuaian Kredit": adj_credit,
+                    "NSP Debit": nsp_debit,
+                    "NSP Kredit": nsp_credit,
+                }
+            )
+
+        ws_df = format_money_columns(
+            pd.DataFrame(ws_rows),
+            "NS Debit", "NS Kredit", "Penyesuaian Debit", "Penyesuaian Kredit", "NSP Debit", "NSP Kredit",
+        )
+        st.dataframe(ws_df, use_container_width=True, hide_index=True)
+
+
+def page_income_statement():
+    import pandas as pd
+
+    st.header("Laporan Keuangan")
+    start, end = select_report_period("financial_statements")
+
+    with get_session() as session:
+        reports = get_cached_reports(
+            session, None, "income_statement", "capital_statement", "balance_sheet", start=start, end=end
+        )
+
+    income = reports["income_statement"]
+    capital = reports["capital_statement"]
+    balance = reports["balance_sheet"]
+
+    # =======================
+    # LAPORAN LABA RUGI (hanya yang ada saldo)
+    # =======================
+    revenue_rows = income["revenue_rows"]
+    expense_rows = income["expense_rows"]
+    total_revenue = income["total_revenue"]
+    total_expense = income["total_expense"]
+    net_income = income["net_income"]
+
+    st.subheader(f"Laporan Laba Rugi")
+
+    lr_rows = []
+    if revenue_rows:
+        lr_rows.append({"Transaksi": "Pendapatan", "Nominal": None})
+        for name, bal in revenue_rows:
+            lr_rows.append({"Transaksi": name, "Nominal": bal})
+        lr_rows.append({"Transaksi": "Total Pendapatan", "Nominal": total_revenue})
+
+    if expense_rows:
+        lr_rows.append({"Transaksi": "Beban", "Nominal": None})
+        for name, bal in expense_rows:
+            lr_rows.append({"Transaksi": name, "Nominal": bal})
+        lr_rows.append({"Transaksi": "Total Beban", "Nominal": total_expense})
+
+    lr_rows.append({"Transaksi": "Laba Bersih", "Nominal": net_income})
+
+    if len(lr_rows) > 1:  # Jika ada data selain header
+        df_lr = pd.DataFrame(lr_rows)
+        df_lr_no_index = format_money_columns(df_lr, "Nominal").set_index("Transaksi")
+        st.table(df_lr_no_index)
+    else:
+        st.info("Belum ada data laporan laba rugi untuk tahun ini.")
+
+    # =======================
+    # LAPORAN PERUBAHAN MODAL (hanya yang ada saldo)
+    # =======================
+    equity_rows = capital["equity_rows"]
+    prive_rows = capital["prive_rows"]
+    total_equity = capital["total_equity"]
+    total_prive = capital["total_prive"]
+    modal_akhir = capital["modal_akhir"]
+
+    if equity_rows or prive_rows:
+        st.markdown("")
+        st.subheader(f"Laporan Perubahan Modal")
+
+        lpm_rows = []
+        if equity_rows:
+            lpm_rows.append({"Transaksi": "Ekuitas", "Nominal": None})
+            for name, bal in equity_rows:
+                lpm_rows.append({"Transaksi": name, "Nominal": bal})
+            lpm_rows.append({"Transaksi": "Total Ekuitas", "Nominal": total_equity})
+
+        if prive_rows:
+            lpm_rows.append({"Transaksi": "Prive", "Nominal": None})
+            for name, bal in prive_rows:
+                lpm_rows.append({"Transaksi": name, "Nominal": bal})
+            lpm_rows.append({"Transaksi": "Total Prive", "Nominal": total_prive})
+
+        lpm_rows.append({"Transaksi": "Laba Bersih", "Nominal": net_income})
+        lpm_rows.append({"Transaksi": "Modal Akhir", "Nominal": modal_akhir})
+
+        df_lpm = pd.DataFrame(lpm_rows)
+        df_lpm_no_index = format_money_columns(df_lpm, "Nominal").set_index("Transaksi")
+        st.table(df_lpm_no_index)
+    else:
+        st.info("Belum ada data laporan perubahan modal untuk tahun ini.")
+
+    # =======================
+    # NERACA (hanya yang ada saldo)
+    # =======================
+    st.markdown("")
+    st.subheader(f"Neraca")
+
+    aset_lancar_rows = balance["aset_lancar_rows"]
+    aset_tetap_rows = balance["aset_tetap_rows"]
+    liab_jangka_pendek_rows = balance["liab_jangka_pendek_rows"]
+    liab_jangka_panjang_rows = balance["liab_jangka_panjang_rows"]
+
+    total_aset_lancar = balance["total_aset_lancar"]
+    total_aset_tetap = balance["total_aset_tetap"]
+    total_aktiva = balance["total_aktiva"]
+    total_liab_jangka_pendek = balance["total_liab_jangka_pendek"]
+    total_liab_jangka_panjang = balance["total_liab_jangka_panjang"]
+    total_liabilitas = balance["total_liabilitas"]
+    total_pasiva = balance["total_pasiva"]
+
+    # Tampilkan Neraca dalam 2 kolom
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.write("**AKTIVA**")
+        aktiva_tabel = []
+
+        if aset_lancar_rows:
+            aktiva_tabel.append({"Transaksi": "**Aset Lancar**", "Nominal": None})
+            for name, bal in aset_lancar_rows:
+                aktiva_tabel.append({"Transaksi": name, "Nominal": bal})
+            aktiva_tabel.append({"Transaksi": "**Total Aset Lancar**", "Nominal": total_aset_lancar})
+            aktiva_tabel.append({"Transaksi": "", "Nominal": None})
+
+        if aset_tetap_rows:
+            aktiva_tabel.append({"Transaksi": "**Aset Tetap**", "Nominal": None})
+            for name, bal in aset_tetap_rows:
+                aktiva_tabel.append({"Transaksi": name, "Nominal": bal})
+            aktiva_tabel.append({"Transaksi": "**Total Aset Tetap**", "Nominal": total_aset_tetap})
+            aktiva_tabel.append({"Transaksi": "", "Nominal": None})
+
+        aktiva_tabel.append({"Transaksi": "**TOTAL AKTIVA**", "Nominal": total_aktiva})
+
+        if aktiva_tabel:
+            df_aktiva = pd.DataFrame(aktiva_tabel)
+            df_aktiva_no_index = format_money_columns(df_aktiva, "Nominal").set_index("Transaksi")
+            st.table(df_aktiva_no_index)
+        else:
+            st.info("Belum ada data aktiva")
+
+    with col2:
+        st.write("**PASIVA**")
+        pasiva_tabel = []
+
+        if liab_jangka_pendek_rows:
+            pasiva_tabel.append({"Transaksi": "**Liabilitas Jangka Pendek**", "Nominal": None})
+            for name, bal in liab_jangka_pendek_rows:
+                pasiva_tabel.append({"Transaksi": name, "Nominal": bal})
+            pasiva_tabel.append({"Transaksi": "**Total Liabilitas Jangka Pendek**", "Nominal": total_liab_jangka_pendek})
+            pasiva_tabel.append({"Transaksi": "", "Nominal": None})
+
+        if liab_jangka_panjang_rows:
+            pasiva_tabel.append({"Transaksi": "**Liabilitas Jangka Panjang**", "Nominal": None})
+            for name, bal in liab_jangka_panjang_rows:
+                pasiva_tabel.append({"Transaksi": name, "Nominal": bal})
+            pasiva_tabel.append({"Transaksi": "**Total Liabilitas Jangka Panjang**", "Nominal": total_liab_jangka_panjang})
+            pasiva_tabel.append({"Transaksi": "", "Nominal": None})
+
+        pasiva_tabel.append({"Transaksi": "**Total Liabilitas**", "Nominal": total_liabilitas})
+        pasiva_tabel.append({"Transaksi": "", "Nominal": None})
+        pasiva_tabel.append({"Transaksi": "**Modal Akhir**", "Nominal": modal_akhir})
+        pasiva_tabel.append({"Transaksi": "", "Nominal": None})
+        pasiva_tabel.append({"Transaksi": "**TOTAL PASIVA**", "Nominal": total_pasiva})
+
+        if pasiva_tabel:
+            df_pasiva = pd.DataFrame(pasiva_tabel)
+            df_pasiva_no_index = format_money_columns(df_pasiva, "Nominal").set_index("Transaksi")
+            st.table(df_pasiva_no_index)
+        else:
+            st.info("Belum ada data pasiva")
+
+    # Cek keseimbangan neraca
+    st.markdown("---")
+    if total_aktiva == total_pasiva:
+        st.success("✅ Neraca Balance: Total Aktiva = Total Pasiva")
+    else:
+        st.error(f"❌ Neraca Tidak Balance: Aktiva {format_cents(total_aktiva)} vs Pasiva {format_cents(total_pasiva)}")
+
+
+def page_accounts():
+    import pandas as pd
+
+    st.header("Daftar Akun")
+
+    with get_session() as session:
+        accounts = (
+            session.query(Account)
+            .order_by(Account.code)
+            .all()
+        )
+
+        rows = [
+            {
+                "Kode": a.code,
+                "Nama": a.name,
+                "Tipe": a.account_type,
+                "Aktif": a.is_active,
+            }
+            for a in accounts
+        ]
+
+        if rows:
+            df = pd.DataFrame(rows)
+            st.dataframe(df, use_container_width=True)
+        else:
+            st.info("Belum ada akun.")
+
+        st.subheader("Aksi Akun")
+        for a in accounts:
+            c1, c2, c3 = st.columns([6, 1, 1])
+            c1.write(f"{a.code} - {a.name} ({a.account_type})")
+
+            if c2.button("Edit", key=f"edit_account_{a.id}"):
+                st.session_state["edit_account_id"] = a.id
+                st.rerun()
+
+            if c3.button("Delete", key=f"del_account_{a.id}"):
+                st.session_state["delete_account_id"] = a.id
+                st.rerun()
+
+        # pilihan tipe akun
+        type_choices = [
+            ("asset", "Aset"),
+            ("liability", "Liabilitas"),
+            ("equity", "Ekuitas"),
+            ("prive", "Prive"),
+            ("revenue", "Pendapatan"),
+            ("expense", "Beban"),
+        ]
+
+        # ===========================
+        # FORM EDIT AKUN
+        # ===========================
+        if "edit_account_id" in st.session_state:
+            edit_id = st.session_state["edit_account_id"]
+            acc = session.query(Account).filter(Account.id == edit_id).first()
+
+            st.markdown("---")
+            st.subheader("Edit Akun")
+
+            with st.form("form_edit_account"):
+                code = st.text_input("Kode akun", value=acc.code)
+                name = st.text_input("Nama akun", value=acc.name)
+                account_type = st.selectbox(
+                    "Tipe akun",
+                    options=type_choices,
+                    index=[t[0] for t in type_choices].index(acc.account_type),
+                    format_func=lambda x: x[1],
+                )
+                is_active = st.checkbox("Aktif", value=acc.is_active)
+
+                submitted_edit = st.form_submit_button("Simpan Perubahan")
+
+            if submitted_edit:
+                if not code or not name:
+                    st.error("Kode dan nama akun wajib diisi.")
+                else:
+                    existing = (
+                        session.query(Account)
+                        .filter(Account.code == code, Account.id != edit_id)
+                        .first()
+                    )
+                    if existing:
+                        st.error("Kode akun sudah digunakan oleh akun lain.")
+                    else:
+                        acc.code = code
+                        acc.name = name
+                        acc.account_type = account_type[0]
+                        acc.is_active = is_active
+                        # nama dan tipe akun ikut tersimpan di snapshot semua tahun yang sudah ditutup
+                        refresh_report_snapshots(session, *get_closed_years(session))
+                        session.commit()
+                        st.success("Akun berhasil diperbarui.")
+                        del st.session_state["edit_account_id"]
+                        st.rerun()
+
+        # ===========================
+        # KONFIRMASI DELETE AKUN
+        # ===========================
+        if "delete_account_id" in st.session_state:
+            del_id = st.session_state["delete_account_id"]
+            acc = session.query(Account).filter(Account.id == del_id).first()
+
+            st.markdown("---")
+            st.error(f"Yakin ingin menghapus akun: {acc.code} - {acc.name}?")
+
+            used = (
+                session.query(JournalLine)
+                .filter(JournalLine.account_id == del_id)
+                .first()
+            )
+
+            if used:
+                st.warning("Akun ini sudah dipakai di jurnal, tidak bisa dihapus.")
+                if st.button("Tutup pesan"):
+                    del st.session_state["delete_account_id"]
+                    st.rerun()
+            else:
+                c1, c2 = st.columns(2)
+                if c1.button("Ya, hapus akun ini"):
+                    session.delete(acc)
+                    session.commit()
+                    st.success("Akun berhasil dihapus.")
+                    del st.session_state["delete_account_id"]
+                    st.rerun()
+                if c2.button("Batal"):
+                    del st.session_state["delete_account_id"]
+                    st.rerun()
+
+        st.markdown("---")
+        st.subheader("Tambah Akun Baru")
+
+        # FORM TAMBAH AKUN
+        with st.form("form_add_account"):
+            code = st.text_input("Kode akun")
+            name = st.text_input("Nama akun")
+            account_type = st.selectbox(
+                "Tipe akun",
+                options=type_choices,
+                format_func=lambda x: x[1],
+            )
+            is_active = st.checkbox("Aktif", value=True)
+            submitted = st.form_submit_button("Simpan")
+
+        if submitted:
+            if not code or not name:
+                st.error("Kode dan nama akun wajib diisi.")
+                return
+
+            existing = (
+                session.query(Account)
+                .filter(Account.code == code)
+                .first()
+            )
+            if existing:
+                st.error("Kode akun sudah ada.")
+                return
+
+            acc = Account(
+                code=code,
+                name=name,
+                account_type=account_type[0],
+                is_active=is_active,
+            )
+            session.add(acc)
+            session.commit()
+            st.success("Akun berhasil ditambahkan.")
+            st.rerun()
+
+
+def page_close_year():
+    st.header("Penyesuaian")
+    year = st.number_input("Tahun", min_value=2000, max_value=2100, value=current_year(), step=1)
+
+    with get_session() as session:
+        closed = is_year_closed(session, year)
+
+        st.write(f"Status tahun {year}: {'Proses penyesuaian' if closed else 'Belum proses penyesuaian'}")
+
+        col1, col2 = st.columns(2)
+        if col1.button("Proses penyesesuaian"):
+            if closed:
+                st.warning("Saat ini sedang dalam proses penyesuaian.")
+            else:
+                status = (
+                    session.query(ClosingStatus)
+                    .filter(ClosingStatus.year == year)
+                    .first()
+                )
+                if not status:
+                    status = ClosingStatus(year=year, is_closed=True)
+                    session.add(status)
+                else:
+                    status.is_closed = True
+                build_report_snapshots(session, year)
+                session.commit()
+                st.success(f"Tahun {year} proses penyesuian.")
+                st.rerun()
+
+        if col2.button("Buka kembali sebelum penyesuaian"):
+            status = (
+                session.query(ClosingStatus)
+                .filter(ClosingStatus.year == year)
+                .first()
+            )
+            if not status:
+                st.warning("Belum melakukan proses penyesuaian untuk tahun ini.")
+            else:
+                status.is_closed = False
+                delete_report_snapshots(session, year)
+                # saldo akhir tahun ini dihapus, tahun sesudahnya yang sudah ditutup dihitung ulang
+                refresh_report_snapshots(session, year)
+                session.commit()
+                st.success(f"Tahun {year} sebelum penyesuaian.")
+                st.rerun()
+
+